@@ -6,6 +6,7 @@ from typing import List, Tuple
 from langchain_core.documents import Document
 from retrieval.retriever import VectorRetriever
 from utils.logging import get_logger
+from utils.metrics import timed
 
 logger = get_logger(__name__)
 
@@ -68,7 +69,8 @@ class AgentController:
         )
 
     def retrieve(self, query: str) -> Tuple[AgentDecision, List[Tuple[Document, float]]]:
-        decision = self.decide(query)
+        with timed("agent_decide"):
+            decision = self.decide(query)
         if not decision.require_retrieval:
             logger.info("Skipping retrieval: %s", decision.reason)
             return decision, []
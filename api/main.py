@@ -1,36 +1,123 @@
 """FastAPI surface for ingestion and query."""
 
+import threading
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, ContextManager, Dict, Iterator, List, Optional
 
 from fastapi import UploadFile, File
-import shutil
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from agent.controller import AgentController
 from config.settings import get_settings
 from generation.generator import AnswerGenerator
 from generation.llm_client import OllamaClient
+from generation.pool import OllamaPool
+from generation.scheduler import (
+    GenerationScheduler,
+    QueueFullError,
+    SchedulerOverloadedError,
+)
 from ingestion.indexer import build_and_persist_index
-from retrieval.retriever import VectorRetriever
+from ingestion.uploads import UploadBatch, UploadStore, UploadTooLargeError
+from retrieval.retriever import VectorRetriever, document_sources
 from utils.logging import get_logger
+from utils.metrics import REGISTRY, collect_timings, timed
+from utils.profiling import RequestProfiler
 
 logger = get_logger(__name__)
-app = FastAPI(title="Domain-Specific RAG Agent")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Start LLM health probes and warm-up before the first query; stop on shutdown."""
+    pool = get_llm_pool()
+    try:
+        yield
+    finally:
+        pool.stop()
+
+
+app = FastAPI(title="Domain-Specific RAG Agent", lifespan=lifespan)
+REGISTRY.enabled = get_settings().metrics_enabled
+
+# Every build writes the same vector store path; concurrent builds could
+# leave index.faiss and index.pkl from different runs.
+_INDEX_BUILD_LOCK = threading.Lock()
+
+UPLOAD_PATHS = {"/ingest/upload", "/ingest/uploads"}
+PROFILE_ID_HEADER = "X-Profile-Id"
+# Allowance per multipart part for boundaries and part headers.
+MULTIPART_PART_OVERHEAD = 16 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Refuse upload requests whose declared size exceeds the batch limit
+    before the multipart body is received and spooled to disk. The
+    per-file check in `UploadStore` still applies to what gets through.
+
+    A plain ASGI middleware so that every other request passes straight
+    through to the app.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in UPLOAD_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        response = self._check(scope)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _check(scope: Scope) -> Optional[JSONResponse]:
+        settings = get_settings()
+        max_files = 1 if scope["path"] == "/ingest/upload" else settings.upload_max_files
+        limit = max_files * (settings.upload_max_file_bytes + MULTIPART_PART_OVERHEAD)
+        try:
+            declared = int(Headers(scope=scope).get("content-length", "0"))
+        except ValueError:
+            return JSONResponse({"detail": "Invalid Content-Length"}, status_code=400)
+        if declared > limit:
+            return JSONResponse(
+                {"detail": f"Upload request exceeds the {limit} byte limit"},
+                status_code=413,
+            )
+        return None
+
+
+app.add_middleware(UploadSizeLimitMiddleware)
 
 
 class IngestRequest(BaseModel):
     """Request payload for ingestion."""
 
     data_dir: Optional[str] = None
+    include_timings: bool = False
 
 
 class QueryRequest(BaseModel):
     """Request payload for querying."""
 
     query: str
+    include_timings: bool = False
 
 
 def get_retriever() -> VectorRetriever:
@@ -43,16 +130,206 @@ def get_agent() -> AgentController:
     return AgentController(get_retriever())
 
 
+@lru_cache(maxsize=1)
+def get_llm_pool() -> OllamaPool:
+    """Return the process-wide pool of Ollama endpoints (lazy init)."""
+    settings = get_settings()
+    urls = settings.ollama_api_urls or [settings.ollama_api_url]
+    clients = [
+        OllamaClient(
+            api_url=url,
+            model=settings.ollama_model,
+            temperature=settings.ollama_temperature,
+            max_tokens=settings.ollama_max_tokens,
+            keep_alive=settings.ollama_keep_alive,
+        )
+        for url in urls
+    ]
+    pool = OllamaPool(
+        clients,
+        health_check_interval=settings.ollama_health_check_interval,
+        warm_up=settings.ollama_warm_up,
+        max_per_backend=settings.llm_max_concurrency,
+    )
+    pool.start()
+    return pool
+
+
+@lru_cache(maxsize=1)
+def get_scheduler() -> GenerationScheduler:
+    """Return the process-wide LLM scheduler (lazy init)."""
+    settings = get_settings()
+    pool = get_llm_pool()
+    # The limit is per endpoint and enforced by the pool; the scheduler only
+    # bounds the total, so adding endpoints adds throughput.
+    return GenerationScheduler(
+        pool,
+        max_concurrency=settings.llm_max_concurrency * len(pool.backends),
+        max_queue=settings.llm_max_queue,
+        queue_timeout=settings.llm_queue_timeout,
+        retry_after=settings.llm_retry_after_seconds,
+    )
+
+
 def get_generator() -> AnswerGenerator:
     """Create the answer generator (lazy init)."""
+    return AnswerGenerator(get_scheduler())
+
+
+@lru_cache(maxsize=1)
+def get_profiler() -> RequestProfiler:
+    """Return the request profiler (lazy init)."""
+    settings = get_settings()
+    return RequestProfiler(
+        settings.profile_dir,
+        max_profiles=settings.profile_max_files,
+    )
+
+
+def _maybe_profile(
+    request: Request,
+    profile: bool,
+    label: str,
+) -> ContextManager[Optional[str]]:
+    """
+    Profile this request if profiling is enabled in settings and requested
+    via `?profile=true` or an `X-Profile: 1` header.
+    """
+    if not get_settings().profiling_enabled:
+        return nullcontext(None)
+    header = request.headers.get("x-profile", "").lower()
+    if not (profile or header in {"1", "true", "yes"}):
+        return nullcontext(None)
+    return _profiled(request, label)
+
+
+@contextmanager
+def _profiled(request: Request, label: str) -> Iterator[Optional[str]]:
+    """
+    Profile the block and attach the profile id to error responses.
+
+    HTTP errors get an `X-Profile-Id` header directly; for unhandled errors
+    the id is left on `request.state` for `unhandled_error`.
+    """
+    with get_profiler().profile(label) as profile_id:
+        request.state.profile_id = profile_id
+        try:
+            yield profile_id
+        except HTTPException as exc:
+            if profile_id is not None:
+                exc.headers = {**(exc.headers or {}), PROFILE_ID_HEADER: profile_id}
+            raise
+
+
+def get_upload_store() -> UploadStore:
+    """Create the upload store for the configured data directory."""
     settings = get_settings()
-    llm_client = OllamaClient(
-        api_url=settings.ollama_api_url,
-        model=settings.ollama_model,
-        temperature=settings.ollama_temperature,
-        max_tokens=settings.ollama_max_tokens,
+    return UploadStore(
+        settings.data_dir,
+        max_file_bytes=settings.upload_max_file_bytes,
+        chunk_size=settings.upload_chunk_bytes,
+    )
+
+
+def _commit_and_index(batch: UploadBatch, data_dir: Path) -> Optional[Path]:
+    """
+    Move a staged batch into place and rebuild the index, or undo both.
+
+    Runs under `_INDEX_BUILD_LOCK` so a failed batch never removes files
+    that another batch's build has already indexed.
+    """
+    with _INDEX_BUILD_LOCK:
+        try:
+            batch.commit()
+            if not any(not upload.is_duplicate for upload in batch.uploads):
+                logger.info(
+                    "All %d upload(s) were duplicates; skipping ingestion",
+                    len(batch.uploads),
+                )
+                index_path = None
+            else:
+                index_path = build_and_persist_index(data_dir)
+        except BaseException:
+            batch.rollback()
+            raise
+        batch.finish()
+    return index_path
+
+
+async def _ingest_uploads(files: List[UploadFile]) -> Dict[str, Any]:
+    """
+    Store a batch of uploaded PDFs and run a single ingestion for it.
+
+    Disk writes and index building run in the threadpool so the event loop
+    is never blocked. The batch is all-or-nothing: if any file is rejected
+    or ingestion fails, files stored by this batch are removed again and
+    any files they replaced are restored.
+    """
+    settings = get_settings()
+
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    if len(files) > settings.upload_max_files:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.upload_max_files} files may be uploaded per request",
+        )
+
+    for file in files:
+        if not file.filename or not file.filename.lower().endswith(".pdf"):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+    batch = get_upload_store().batch()
+
+    try:
+        for file in files:
+            await run_in_threadpool(batch.add, file.file, file.filename)
+    except UploadTooLargeError as exc:
+        await run_in_threadpool(batch.rollback)
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except ValueError as exc:
+        await run_in_threadpool(batch.rollback)
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except BaseException:
+        await run_in_threadpool(batch.rollback)
+        raise
+    finally:
+        for file in files:
+            await file.close()
+
+    index_path = await run_in_threadpool(_commit_and_index, batch, settings.data_dir)
+    stored = batch.uploads
+    new_uploads = [upload for upload in stored if not upload.is_duplicate]
+
+    return {
+        "status": "success",
+        "uploaded_files": [upload.filename for upload in new_uploads],
+        "duplicates": [
+            {"file": upload.filename, "duplicate_of": upload.duplicate_of}
+            for upload in stored
+            if upload.is_duplicate
+        ],
+        "index_path": str(index_path) if index_path else None,
+    }
+
+
+@app.exception_handler(Exception)
+async def unhandled_error(request: Request, exc: Exception) -> JSONResponse:
+    """
+    Plain 500 for unhandled errors, carrying the profile id of a profiled
+    request so its profile can be found. The error is still re-raised to
+    the server and logged there.
+    """
+    headers = {}
+    profile_id = getattr(request.state, "profile_id", None)
+    if profile_id is not None:
+        headers[PROFILE_ID_HEADER] = profile_id
+    return JSONResponse(
+        {"detail": "Internal Server Error"},
+        status_code=500,
+        headers=headers,
     )
-    return AnswerGenerator(llm_client)
 
 
 @app.get("/")
@@ -61,40 +338,107 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/llm/scheduler")
+def scheduler_stats() -> Dict[str, Any]:
+    """Expose LLM queue state and queue-time metrics."""
+    return get_scheduler().stats()
+
+
+@app.get("/llm/backends")
+def backend_stats() -> List[Dict[str, Any]]:
+    """Expose health and load of each Ollama endpoint."""
+    return get_llm_pool().stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint for stage latencies and LLM statistics."""
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @app.post("/ingest")
-def ingest(payload: IngestRequest) -> Dict[str, Any]:
+def ingest(
+    payload: IngestRequest,
+    request: Request,
+    response: Response,
+    profile: bool = False,
+) -> Dict[str, Any]:
     """Trigger ingestion and index creation."""
     data_dir = Path(payload.data_dir) if payload.data_dir else None
-    index_path = build_and_persist_index(data_dir)
-    return {"index_path": str(index_path)}
+    with _maybe_profile(request, profile, "ingest") as profile_id:
+        with collect_timings(payload.include_timings) as timings:
+            with timed("ingest"), _INDEX_BUILD_LOCK:
+                index_path = build_and_persist_index(data_dir)
+
+    result: Dict[str, Any] = {"index_path": str(index_path)}
+    if timings is not None:
+        result["timings"] = timings
+    if profile_id is not None:
+        result["profile_id"] = profile_id
+        response.headers[PROFILE_ID_HEADER] = profile_id
+    return result
 
 @app.post("/ingest/upload")
 async def ingest_upload(file: UploadFile = File(...)) -> Dict[str, Any]:
     """
     Upload a PDF file in real time and trigger ingestion.
     """
-    data_dir = Path("data")
-    data_dir.mkdir(exist_ok=True)
+    result = await _ingest_uploads([file])
+    return {
+        "status": result["status"],
+        "uploaded_file": file.filename,
+        "duplicate": bool(result["duplicates"]),
+        "index_path": result["index_path"],
+    }
 
-    if not file.filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
-    file_path = data_dir / file.filename
+@app.post("/ingest/uploads")
+async def ingest_uploads(
+    files: List[UploadFile] = File(...),
+    include_timings: bool = False,
+) -> Dict[str, Any]:
+    """
+    Upload several PDF files and ingest them with a single index build.
 
-    with file_path.open("wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    Files whose content is already present in the data directory are
+    skipped and reported under `duplicates`.
+    """
+    with collect_timings(include_timings) as timings:
+        with timed("ingest_upload"):
+            response = await _ingest_uploads(files)
 
-    index_path = build_and_persist_index(data_dir)
+    if timings is not None:
+        response["timings"] = timings
+    return response
 
-    return {
-        "status": "success",
-        "uploaded_file": file.filename,
-        "index_path": str(index_path),
-    }
 
 @app.post("/query")
-def query(payload: QueryRequest) -> Dict[str, Any]:
+def query(
+    payload: QueryRequest,
+    request: Request,
+    response: Response,
+    profile: bool = False,
+) -> Dict[str, Any]:
     """Handle user queries with agentic control."""
+    with _maybe_profile(request, profile, "query") as profile_id:
+        with collect_timings(payload.include_timings) as timings:
+            with timed("query"):
+                result = _answer_query(payload)
+
+    if timings is not None:
+        result["timings"] = timings
+    if profile_id is not None:
+        result["profile_id"] = profile_id
+        response.headers[PROFILE_ID_HEADER] = profile_id
+    return result
+
+
+def _answer_query(payload: QueryRequest) -> Dict[str, Any]:
     agent = get_agent()
     generator = get_generator()
 
@@ -113,9 +457,17 @@ def query(payload: QueryRequest) -> Dict[str, Any]:
             detail="No supporting evidence found for this query. Ingest documents or refine the question.",
         )
 
-    answer = generator.generate(payload.query, retrieved)
+    try:
+        answer = generator.generate(payload.query, retrieved)
+    except SchedulerOverloadedError as exc:
+        raise HTTPException(
+            status_code=429 if isinstance(exc, QueueFullError) else 503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
     citations: List[str] = [
-        doc.metadata.get("source", "unknown") for doc, _score in retrieved
+        source for doc, _score in retrieved for source in document_sources(doc)
     ]
     return {"answer": answer, "citations": citations, "reason": decision.reason}
 
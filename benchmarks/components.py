@@ -0,0 +1,232 @@
+"""
+Micro-benchmarks for the ingestion and retrieval components.
+
+Generates a synthetic corpus and measures each stage in isolation:
+loading, chunking, deduplication, embedding throughput, FAISS index
+build, index size on disk / process RSS, and retrieval latency.
+
+Usage:
+    python -m benchmarks.components --docs 200 --fake-embeddings \\
+        --output results/bench.json
+    python -m benchmarks.components --compare results/bench.json
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from benchmarks.corpus import generate_corpus, sample_queries
+from benchmarks.reporting import (
+    compare_results,
+    current_rss_bytes,
+    directory_size_bytes,
+    peak_rss_bytes,
+    quiet_repo_loggers,
+    run_metadata,
+    summarize_latencies,
+    write_results,
+)
+from config.settings import get_settings
+from ingestion.chunker import chunk_documents
+from ingestion.dedup import deduplicate_chunks
+from ingestion.indexer import create_embedding_model
+from ingestion.loader import load_documents
+from retrieval.retriever import VectorRetriever
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+def run_benchmarks(
+    work_dir: Path,
+    embeddings: Embeddings,
+    *,
+    num_docs: int = 100,
+    words_per_doc: int = 2000,
+    duplicate_ratio: float = 0.1,
+    chunk_size: int = 800,
+    chunk_overlap: int = 120,
+    dedup: bool = True,
+    num_queries: int = 200,
+    top_k: int = 4,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run every component benchmark once and return the measurements."""
+    results: Dict[str, Any] = {}
+
+    corpus_dir = work_dir / "corpus"
+    paths = generate_corpus(
+        corpus_dir,
+        num_docs=num_docs,
+        words_per_doc=words_per_doc,
+        duplicate_ratio=duplicate_ratio,
+        seed=seed,
+    )
+    results["corpus"] = {
+        "documents": len(paths),
+        "bytes": directory_size_bytes(corpus_dir),
+    }
+
+    start = perf_counter()
+    documents = load_documents(corpus_dir)
+    elapsed = perf_counter() - start
+    results["load_documents"] = {
+        "seconds": elapsed,
+        "documents": len(documents),
+        "docs_per_second": _rate(len(documents), elapsed),
+    }
+
+    start = perf_counter()
+    chunks = chunk_documents(documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    elapsed = perf_counter() - start
+    results["chunk_documents"] = {
+        "seconds": elapsed,
+        "chunks": len(chunks),
+        "chunks_per_second": _rate(len(chunks), elapsed),
+    }
+
+    if dedup:
+        start = perf_counter()
+        chunks, stats = deduplicate_chunks(chunks)
+        elapsed = perf_counter() - start
+        results["deduplicate_chunks"] = {
+            "seconds": elapsed,
+            "chunks_out": stats.output_chunks,
+            "reduction_ratio": stats.reduction_ratio,
+            "chunks_per_second": _rate(stats.input_chunks, elapsed),
+        }
+
+    texts = [chunk.page_content for chunk in chunks]
+    rss_before = current_rss_bytes()
+
+    start = perf_counter()
+    vectors = embeddings.embed_documents(texts)
+    elapsed = perf_counter() - start
+    results["embedding"] = {
+        "seconds": elapsed,
+        "chunks": len(texts),
+        "dimension": len(vectors[0]) if vectors else 0,
+        "chunks_per_second": _rate(len(texts), elapsed),
+    }
+
+    start = perf_counter()
+    store = FAISS.from_embeddings(
+        zip(texts, vectors),
+        embeddings,
+        metadatas=[chunk.metadata for chunk in chunks],
+    )
+    results["index_build"] = {"seconds": perf_counter() - start, "vectors": len(texts)}
+
+    index_path = work_dir / "faiss_index"
+    start = perf_counter()
+    store.save_local(index_path.as_posix())
+    rss_after = current_rss_bytes()
+    results["index_size"] = {
+        "persist_seconds": perf_counter() - start,
+        "disk_bytes": directory_size_bytes(index_path),
+        "rss_delta_bytes": (
+            rss_after - rss_before if rss_after is not None and rss_before is not None else None
+        ),
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+    del store, vectors
+
+    retriever = VectorRetriever(index_path, top_k=top_k, embeddings=embeddings)
+    queries = sample_queries(paths, num_queries, seed=seed)
+
+    start = perf_counter()
+    retriever.retrieve(queries[0])
+    results["retrieve_cold_seconds"] = perf_counter() - start
+
+    latencies = []
+    for query in queries:
+        start = perf_counter()
+        retriever.retrieve(query)
+        latencies.append(perf_counter() - start)
+    results["retrieve"] = summarize_latencies(latencies)
+
+    return results
+
+
+def main(argv: Optional[list] = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=100, help="Synthetic documents to generate")
+    parser.add_argument("--words-per-doc", type=int, default=2000)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1)
+    parser.add_argument("--chunk-size", type=int, default=settings.chunk_size)
+    parser.add_argument("--chunk-overlap", type=int, default=settings.chunk_overlap)
+    parser.add_argument("--no-dedup", action="store_true", help="Skip the dedup stage")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=settings.retriever_top_k)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--fake-embeddings",
+        action="store_true",
+        help="Use a deterministic hash-based embedding model (offline, no model download)",
+    )
+    parser.add_argument("--embedding-dim", type=int, default=384, help="Dimension for fake embeddings")
+    parser.add_argument("--work-dir", type=Path, help="Keep corpus and index here instead of a temp dir")
+    parser.add_argument("--output", type=Path, help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="Print changes relative to a previous results file")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging from the pipeline")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        quiet_repo_loggers()
+
+    if args.fake_embeddings:
+        embeddings: Embeddings = DeterministicFakeEmbedding(size=args.embedding_dim)
+        model_name = f"deterministic-fake-{args.embedding_dim}"
+    else:
+        embeddings = create_embedding_model(
+            settings.embedding_model_name,
+            settings.embedding_batch_size,
+        )
+        model_name = settings.embedding_model_name
+
+    parameters = {
+        "docs": args.docs,
+        "words_per_doc": args.words_per_doc,
+        "duplicate_ratio": args.duplicate_ratio,
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "dedup": not args.no_dedup,
+        "queries": args.queries,
+        "top_k": args.top_k,
+        "seed": args.seed,
+        "embedding_model": model_name,
+    }
+
+    with tempfile.TemporaryDirectory(prefix="rag-bench-") as tmp:
+        results = run_benchmarks(
+            args.work_dir or Path(tmp),
+            embeddings,
+            num_docs=args.docs,
+            words_per_doc=args.words_per_doc,
+            duplicate_ratio=args.duplicate_ratio,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            dedup=not args.no_dedup,
+            num_queries=args.queries,
+            top_k=args.top_k,
+            seed=args.seed,
+        )
+
+    report = {"meta": run_metadata(parameters), "results": results}
+    write_results(report, args.output)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print("\n".join(compare_results(baseline, report)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Deterministic synthetic corpora for benchmarks."""
+
+import random
+from pathlib import Path
+from typing import List
+
+_SYLLABLES = (
+    "ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "ze", "do",
+    "pa", "qu", "re", "si", "tu", "ba", "ce", "fo", "gi", "ha",
+)
+
+BOILERPLATE = (
+    "This document is provided for informational purposes only and does not "
+    "constitute professional advice. All rights reserved. Reproduction without "
+    "written permission of the publisher is prohibited."
+)
+
+
+def build_vocabulary(size: int, seed: int = 0) -> List[str]:
+    """Pseudo-words built from syllables, stable for a given seed."""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+
+def _sentence(rng: random.Random, vocabulary: List[str]) -> str:
+    words = [rng.choice(vocabulary) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random, vocabulary: List[str]) -> str:
+    return " ".join(_sentence(rng, vocabulary) for _ in range(rng.randint(3, 7)))
+
+
+def generate_corpus(
+    target_dir: Path,
+    *,
+    num_docs: int,
+    words_per_doc: int,
+    duplicate_ratio: float = 0.1,
+    vocabulary_size: int = 5000,
+    seed: int = 0,
+) -> List[Path]:
+    """
+    Write `num_docs` text documents of roughly `words_per_doc` words.
+
+    A `duplicate_ratio` share of paragraphs is boilerplate or copied from
+    an earlier document, mimicking revised PDFs, so deduplication has
+    realistic work to do.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(vocabulary_size, seed)
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    paths: List[Path] = []
+    previous: List[str] = []
+    for doc_index in range(num_docs):
+        paragraphs: List[str] = []
+        word_count = 0
+        while word_count < words_per_doc:
+            if previous and rng.random() < duplicate_ratio:
+                paragraph = rng.choice((BOILERPLATE, rng.choice(previous)))
+            else:
+                paragraph = _paragraph(rng, vocabulary)
+            paragraphs.append(paragraph)
+            word_count += len(paragraph.split())
+
+        previous = paragraphs
+        path = target_dir / f"doc_{doc_index:05d}.txt"
+        path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+        paths.append(path)
+
+    return paths
+
+
+def sample_queries(
+    paths: List[Path],
+    num_queries: int,
+    *,
+    seed: int = 0,
+) -> List[str]:
+    """Pick query strings from sentences of the generated documents."""
+    rng = random.Random(seed)
+    queries: List[str] = []
+    for _ in range(num_queries):
+        text = rng.choice(paths).read_text(encoding="utf-8")
+        sentences = [s.strip() for s in text.split(".") if s.strip()]
+        words = rng.choice(sentences).split()
+        queries.append(" ".join(words[: rng.randint(4, 10)]) + "?")
+    return queries
@@ -0,0 +1,210 @@
+"""
+Stand-in for an Ollama server with controllable latency.
+
+Serves /api/generate (streaming and non-streaming), /api/tags and /api/ps.
+Each generation waits `ttft` seconds before the first token and then emits
+tokens at `tokens_per_second`. At most `max_parallel` generations run at
+once; the rest queue inside the server, like OLLAMA_NUM_PARALLEL.
+
+Usage:
+    python -m benchmarks.fake_ollama --port 11434 --ttft 0.3 --tokens-per-second 40
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+_NANOSECONDS = 1_000_000_000
+
+
+class FakeOllamaServer:
+    """Threaded HTTP server emulating Ollama's generation timing."""
+
+    def __init__(
+        self,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        model: str = "llama3",
+        ttft: float = 0.2,
+        tokens_per_second: float = 50.0,
+        max_tokens: int = 128,
+        jitter: float = 0.1,
+        max_parallel: int = 4,
+        seed: int = 0,
+    ) -> None:
+        self.model = model
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.max_tokens = max_tokens
+        self.jitter = jitter
+        self._slots = threading.Semaphore(max_parallel)
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.requests_served = 0
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _jittered(self, value: float) -> float:
+        with self._rng_lock:
+            return max(0.0, value * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+    def _stats(self, prompt: str, tokens: int, ttft: float, eval_seconds: float) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "done": True,
+            "load_duration": 0,
+            "prompt_eval_count": len(prompt.split()),
+            "prompt_eval_duration": int(ttft * _NANOSECONDS),
+            "eval_count": tokens,
+            "eval_duration": int(eval_seconds * _NANOSECONDS),
+            "total_duration": int((ttft + eval_seconds) * _NANOSECONDS),
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                if self.path in ("/api/tags", "/api/ps"):
+                    self._send_json(200, {"models": [{"name": f"{server.model}:latest"}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                if self.path != "/api/generate":
+                    self._send_json(404, {"error": "not found"})
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": "invalid JSON"})
+                    return
+
+                prompt = payload.get("prompt", "")
+                if not prompt:
+                    # Ollama loads the model and returns immediately.
+                    self._send_json(200, {"model": server.model, "response": "", "done": True})
+                    return
+
+                requested = payload.get("options", {}).get("num_predict", server.max_tokens)
+                tokens = max(1, min(int(requested), server.max_tokens))
+                with server._slots:
+                    with server._rng_lock:
+                        server.requests_served += 1
+                    if payload.get("stream", True):
+                        self._stream(prompt, tokens)
+                    else:
+                        self._complete(prompt, tokens)
+
+            def _complete(self, prompt: str, tokens: int) -> None:
+                ttft = server._jittered(server.ttft)
+                eval_seconds = server._jittered(tokens / server.tokens_per_second)
+                time.sleep(ttft + eval_seconds)
+                body = server._stats(prompt, tokens, ttft, eval_seconds)
+                body["response"] = " ".join(f"tok{i}" for i in range(tokens))
+                self._send_json(200, body)
+
+            def _stream(self, prompt: str, tokens: int) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def write(body: Dict[str, Any]) -> None:
+                    line = json.dumps(body).encode("utf-8") + b"\n"
+                    self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                    self.wfile.flush()
+
+                ttft = server._jittered(server.ttft)
+                time.sleep(ttft)
+                start = time.monotonic()
+                for index in range(tokens):
+                    if index:
+                        time.sleep(1 / server.tokens_per_second)
+                    write({"model": server.model, "response": f"tok{index} ", "done": False})
+                body = server._stats(prompt, tokens, ttft, time.monotonic() - start)
+                body["response"] = ""
+                write(body)
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def serve_forever(self) -> None:
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def start(self) -> "FakeOllamaServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            name="fake-ollama",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Ollama server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--model", default="llama3")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--max-parallel", type=int, default=4)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host,
+        port=args.port,
+        model=args.model,
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        max_tokens=args.max_tokens,
+        jitter=args.jitter,
+        max_parallel=args.max_parallel,
+    )
+    print(f"Fake Ollama listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+End-to-end load test for the /query endpoint.
+
+By default the FastAPI app is started in-process against a fake Ollama
+server (see `benchmarks.fake_ollama`) and a synthetic FAISS index built
+with deterministic fake embeddings, so runs are reproducible and offline.
+Traffic is open-loop: requests are sent on a fixed (or Poisson) schedule
+at the target rate regardless of how fast responses come back, and
+latency is measured from the scheduled send time so client-side backlog
+is not hidden.
+
+Usage:
+    python -m benchmarks.load_test --qps 5 --duration 30 --ttft 0.3
+    python -m benchmarks.load_test --target-url http://rag.internal:8000 --qps 2 \\
+        --queries-file questions.txt
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from benchmarks.corpus import generate_corpus, sample_queries
+from benchmarks.fake_ollama import FakeOllamaServer
+from benchmarks.reporting import (
+    quiet_repo_loggers,
+    run_metadata,
+    summarize_latencies,
+    write_results,
+)
+from ingestion.chunker import chunk_documents
+from ingestion.loader import load_documents
+
+SMALL_TALK = ("hello", "hi", "thanks", "how are you", "good morning")
+
+
+class QueryMix:
+    """
+    Realistic blend of queries.
+
+    Most are distinct document questions; a share repeats a small set of
+    popular questions (exercising in-flight coalescing), and a share is
+    small talk that the agent answers without retrieval.
+    """
+
+    def __init__(
+        self,
+        document_queries: List[str],
+        *,
+        repeat_ratio: float = 0.15,
+        small_talk_ratio: float = 0.1,
+        popular: int = 5,
+        seed: int = 0,
+    ) -> None:
+        if not document_queries:
+            raise ValueError("QueryMix needs at least one document query")
+        self._rng = random.Random(seed)
+        self.document_queries = document_queries
+        self.popular = document_queries[:popular]
+        self.repeat_ratio = repeat_ratio
+        self.small_talk_ratio = small_talk_ratio
+
+    def next(self) -> str:
+        roll = self._rng.random()
+        if roll < self.small_talk_ratio:
+            return self._rng.choice(SMALL_TALK)
+        if roll < self.small_talk_ratio + self.repeat_ratio:
+            return self._rng.choice(self.popular)
+        return self._rng.choice(self.document_queries)
+
+
+def build_synthetic_index(
+    work_dir: Path,
+    embeddings: Embeddings,
+    *,
+    num_docs: int,
+    num_queries: int,
+    seed: int = 0,
+) -> Tuple[Path, List[str]]:
+    """Index a synthetic corpus and return the index path and sample queries."""
+    paths = generate_corpus(work_dir / "corpus", num_docs=num_docs, words_per_doc=1500, seed=seed)
+    chunks = chunk_documents(load_documents(work_dir / "corpus"), chunk_size=800, chunk_overlap=120)
+    index_path = work_dir / "faiss_index"
+    FAISS.from_documents(chunks, embeddings).save_local(index_path.as_posix())
+    return index_path, sample_queries(paths, num_queries, seed=seed)
+
+
+def load_queries_file(path: Path) -> List[str]:
+    """Read one question per line, skipping blank lines and `#` comments."""
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_app(fake_ollama_url: str, index_path: Path, embeddings: Embeddings):
+    """
+    Start the API in a background uvicorn thread wired to the fakes.
+
+    Settings are read from the environment, so they are overridden before
+    the app module is imported; the retriever factory is swapped so
+    queries are embedded with the same fake model as the index.
+    """
+    import uvicorn
+
+    os.environ["RAG_OLLAMA_API_URL"] = fake_ollama_url
+    os.environ["RAG_OLLAMA_API_URLS"] = json.dumps([fake_ollama_url])
+    os.environ["RAG_VECTOR_STORE_PATH"] = str(index_path)
+
+    from config.settings import get_settings
+
+    get_settings.cache_clear()
+
+    import api.main as api_main
+    from retrieval.retriever import VectorRetriever
+
+    api_main.get_retriever = lambda: VectorRetriever(index_path, embeddings=embeddings)
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(api_main.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, name="rag-api", daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("API server failed to start")
+        time.sleep(0.05)
+
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def run_load(
+    base_url: str,
+    mix: QueryMix,
+    *,
+    qps: float,
+    duration: float,
+    timeout: float = 120.0,
+    max_in_flight: int = 256,
+    poisson: bool = False,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Drive open-loop /query traffic and summarize the outcome."""
+    rng = random.Random(seed)
+    local = threading.local()
+
+    def send(scheduled: float, query: str) -> Tuple[str, float]:
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        try:
+            response = session.post(
+                f"{base_url}/query",
+                json={"query": query},
+                timeout=timeout,
+            )
+            outcome = str(response.status_code)
+        except requests.RequestException as exc:
+            outcome = type(exc).__name__
+        return outcome, time.perf_counter() - scheduled
+
+    total = max(1, int(qps * duration))
+    futures: List["Future[Tuple[str, float]]"] = []
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        start = time.perf_counter()
+        offset = 0.0
+        for _ in range(total):
+            scheduled = start + offset
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(executor.submit(send, scheduled, mix.next()))
+            offset += rng.expovariate(qps) if poisson else 1 / qps
+
+        results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+
+    statuses = Counter(outcome for outcome, _ in results)
+    ok = [latency for outcome, latency in results if outcome.startswith("2")]
+    rejected = statuses["429"] + statuses["503"]
+    errors = len(results) - len(ok) - rejected
+
+    return {
+        "sent": len(results),
+        "elapsed_seconds": elapsed,
+        "offered_qps": qps,
+        "throughput_qps": len(ok) / elapsed if elapsed else 0.0,
+        "success_rate": len(ok) / len(results),
+        "rejection_rate": rejected / len(results),
+        "error_rate": errors / len(results),
+        "status_counts": dict(statuses),
+        "latency": summarize_latencies(ok),
+        "latency_all": summarize_latencies([latency for _, latency in results]),
+    }
+
+
+def _print_summary(results: Dict[str, Any]) -> None:
+    latency = results["latency"]
+    print(
+        f"sent={results['sent']} throughput={results['throughput_qps']:.2f}/s "
+        f"p50={latency['p50_ms']:.0f}ms p95={latency['p95_ms']:.0f}ms "
+        f"p99={latency['p99_ms']:.0f}ms errors={results['error_rate']:.1%} "
+        f"rejected={results['rejection_rate']:.1%} statuses={results['status_counts']}"
+    )
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--qps", type=float, default=2.0, help="Target request rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of traffic")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of fixed spacing")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--repeat-ratio", type=float, default=0.15)
+    parser.add_argument("--small-talk-ratio", type=float, default=0.1)
+    parser.add_argument("--docs", type=int, default=50, help="Synthetic documents to index")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-url", help="Load an already running deployment instead (needs --queries-file)")
+    parser.add_argument(
+        "--queries-file",
+        type=Path,
+        help="Document questions, one per line, used instead of synthetic ones",
+    )
+    parser.add_argument("--ttft", type=float, default=0.2, help="Fake Ollama time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--ollama-parallel", type=int, default=4, help="Fake Ollama concurrent generations")
+    parser.add_argument("--output", type=Path, help="Write JSON results here instead of stdout")
+    parser.add_argument("--verbose", action="store_true", help="Keep INFO logging from the pipeline")
+    args = parser.parse_args(argv)
+
+    if not args.verbose:
+        quiet_repo_loggers()
+    embeddings = DeterministicFakeEmbedding(size=384)
+    fake: Optional[FakeOllamaServer] = None
+    server = None
+
+    if args.target_url and not args.queries_file:
+        parser.error("--target-url needs --queries-file with questions about that deployment's documents")
+
+    with tempfile.TemporaryDirectory(prefix="rag-load-") as tmp:
+        queries = load_queries_file(args.queries_file) if args.queries_file else []
+
+        if args.target_url:
+            # A synthetic index has nothing to do with the deployment's
+            # documents, so none is built.
+            base_url = args.target_url.rstrip("/")
+        else:
+            index_path, synthetic_queries = build_synthetic_index(
+                Path(tmp),
+                embeddings,
+                num_docs=args.docs,
+                num_queries=200,
+                seed=args.seed,
+            )
+            queries = queries or synthetic_queries
+            fake = FakeOllamaServer(
+                ttft=args.ttft,
+                tokens_per_second=args.tokens_per_second,
+                max_tokens=args.max_tokens,
+                max_parallel=args.ollama_parallel,
+                seed=args.seed,
+            ).start()
+            server, _thread, base_url = start_app(fake.url, index_path, embeddings)
+            if not args.verbose:
+                # The app's loggers only exist once it has been imported.
+                quiet_repo_loggers()
+
+        mix = QueryMix(
+            queries,
+            repeat_ratio=args.repeat_ratio,
+            small_talk_ratio=args.small_talk_ratio,
+            seed=args.seed,
+        )
+        try:
+            results = run_load(
+                base_url,
+                mix,
+                qps=args.qps,
+                duration=args.duration,
+                timeout=args.timeout,
+                max_in_flight=args.max_in_flight,
+                poisson=args.poisson,
+                seed=args.seed,
+            )
+            if server is not None:
+                results["scheduler"] = requests.get(f"{base_url}/llm/scheduler", timeout=10).json()
+        finally:
+            if server is not None:
+                server.should_exit = True
+            if fake is not None:
+                fake.stop()
+
+    parameters = {
+        key: str(value) if isinstance(value, Path) else value
+        for key, value in vars(args).items()
+        if key != "output"
+    }
+    report = {"meta": run_metadata(parameters), "results": results}
+    _print_summary(results)
+    write_results(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Uses environment variables for overrides; keeps sensible local defaults for dev.
 
 from functools import lru_cache
 from pathlib import Path
+from typing import List
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -27,6 +28,17 @@ class AppSettings(BaseSettings):
     chunk_size: int = Field(default=800)
     chunk_overlap: int = Field(default=120)
 
+    # ---------- Deduplication ----------
+    dedup_enabled: bool = Field(default=True)
+    dedup_similarity_threshold: float = Field(default=0.9)
+    dedup_num_perm: int = Field(default=128)
+    dedup_lsh_bands: int = Field(default=16)
+
+    # ---------- Uploads ----------
+    upload_max_file_bytes: int = Field(default=50 * 1024 * 1024)
+    upload_max_files: int = Field(default=20)
+    upload_chunk_bytes: int = Field(default=1024 * 1024)
+
     # ---------- Embeddings ----------
     embedding_model_name: str = Field(
         default="sentence-transformers/all-MiniLM-L6-v2"
@@ -41,6 +53,25 @@ class AppSettings(BaseSettings):
     ollama_model: str = Field(default="llama3")
     ollama_temperature: float = Field(default=0.2)
     ollama_max_tokens: int = Field(default=512)
+    # Optional pool of base URLs; when empty, only ollama_api_url is used.
+    ollama_api_urls: List[str] = Field(default_factory=list)
+    ollama_keep_alive: str = Field(default="30m")
+    ollama_health_check_interval: float = Field(default=15.0)
+    ollama_warm_up: bool = Field(default=True)
+
+    # ---------- LLM scheduling ----------
+    # Per Ollama endpoint; the scheduler allows this many per pool member
+    llm_max_concurrency: int = Field(default=2)
+    llm_max_queue: int = Field(default=8)
+    llm_queue_timeout: float = Field(default=60.0)
+    llm_retry_after_seconds: int = Field(default=5)
+
+    # ---------- Observability ----------
+    metrics_enabled: bool = Field(default=True)
+    # Profiling is off unless enabled here AND requested per request
+    profiling_enabled: bool = Field(default=False)
+    profile_dir: Path = Field(default=BASE_DIR / "profiles")
+    profile_max_files: int = Field(default=50)
 
     # ---------- Retrieval ----------
     retriever_top_k: int = Field(default=4)
@@ -3,8 +3,9 @@
 from typing import Iterable, List, Tuple
 
 from langchain_core.documents import Document
-from generation.llm_client import OllamaClient
+from generation.llm_client import LLMClient
 from retrieval.retriever import format_citations
+from utils.metrics import timed
 
 SYSTEM_PROMPT = (
     "You are a domain-specific assistant.\n"
@@ -45,7 +46,7 @@ def build_prompt(
 class AnswerGenerator:
     """Generate grounded answers using retrieved document context."""
 
-    def __init__(self, client: OllamaClient) -> None:
+    def __init__(self, client: LLMClient) -> None:
         self.client = client
 
     def generate(
@@ -59,7 +60,8 @@ class AnswerGenerator:
         if not retrieved:
             raise ValueError("No retrieved context available for answer generation.")
 
-        prompt = build_prompt(query, retrieved)
+        with timed("build_prompt"):
+            prompt = build_prompt(query, retrieved)
         answer_text = self.client.generate(prompt)
 
         citations = format_citations([doc for doc, _ in retrieved])
@@ -10,14 +10,42 @@ This implementation:
 
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Protocol
 
 import requests
 
 from utils.logging import get_logger
+from utils.metrics import REGISTRY, record_timing, timed
 
 logger = get_logger(__name__)
 
+LLM_TTFT_SECONDS = REGISTRY.histogram(
+    "rag_llm_time_to_first_token_seconds",
+    "Model load plus prompt evaluation time reported by Ollama.",
+)
+LLM_TOKENS_PER_SECOND = REGISTRY.histogram(
+    "rag_llm_tokens_per_second",
+    "Generation throughput reported by Ollama.",
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250, 500),
+)
+LLM_GENERATED_TOKENS = REGISTRY.counter(
+    "rag_llm_generated_tokens_total",
+    "Tokens generated by Ollama.",
+)
+
+_NANOSECONDS = 1e9
+
+
+class LLMClient(Protocol):
+    """Anything that turns a prompt into generated text."""
+
+    def generate(self, prompt: str) -> str:
+        ...
+
+
+class OllamaUnavailableError(RuntimeError):
+    """Raised when an Ollama endpoint cannot be reached or is overloaded."""
+
 
 class OllamaClient:
     """
@@ -34,17 +62,20 @@ class OllamaClient:
         temperature: float = 0.2,
         max_tokens: int = 512,
         timeout: int = 300,
+        keep_alive: Optional[str] = None,
     ) -> None:
         # Normalize API URL
         api_url = api_url.rstrip("/")
-        if not api_url.endswith("/api/generate"):
-            api_url = f"{api_url}/api/generate"
+        if api_url.endswith("/api/generate"):
+            api_url = api_url[: -len("/api/generate")]
 
-        self.api_url = api_url
+        self.base_url = api_url
+        self.api_url = f"{api_url}/api/generate"
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.timeout = timeout
+        self.keep_alive = keep_alive
 
         logger.info(
             "Initialized OllamaClient | model=%s | endpoint=%s",
@@ -68,16 +99,19 @@ class OllamaClient:
                 "num_predict": self.max_tokens,
             },
         }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
 
         logger.info("Sending prompt to Ollama (len=%d chars)", len(prompt))
 
         try:
-            response = requests.post(
-                self.api_url,
-                json=payload,
-                timeout=(10, self.timeout),  # (connect timeout, read timeout)
-            )
-            response.raise_for_status()
+            with timed("llm_generate"):
+                response = requests.post(
+                    self.api_url,
+                    json=payload,
+                    timeout=(10, self.timeout),  # (connect timeout, read timeout)
+                )
+                response.raise_for_status()
 
         except requests.exceptions.ReadTimeout as exc:
             logger.error(
@@ -89,15 +123,92 @@ class OllamaClient:
                 "Try warming the model or reducing context size."
             ) from exc
 
+        except requests.ConnectionError as exc:  # includes ConnectTimeout
+            logger.error("Ollama unreachable at %s: %s", self.base_url, exc)
+            raise OllamaUnavailableError("Failed to communicate with Ollama") from exc
+
+        except requests.HTTPError as exc:
+            logger.error("Ollama request failed: %s", exc)
+            if exc.response is not None and exc.response.status_code == 503:
+                raise OllamaUnavailableError("Ollama is overloaded") from exc
+            raise RuntimeError("Failed to communicate with Ollama") from exc
+
         except requests.RequestException as exc:
             logger.error("Ollama request failed: %s", exc)
             raise RuntimeError("Failed to communicate with Ollama") from exc
 
         data = response.json()
+        self._record_generation_stats(data)
 
         text = data.get("response")
         if not isinstance(text, str) or not text.strip():
             logger.error("Invalid Ollama response payload: %s", data)
             raise ValueError("Ollama returned an empty or invalid response")
 
-        return text.strip()
\ No newline at end of file
+        return text.strip()
+
+    @staticmethod
+    def _record_generation_stats(data: Dict[str, Any]) -> None:
+        """Derive time-to-first-token and tokens/sec from Ollama's timings."""
+        try:
+            ttft = (
+                data.get("load_duration", 0) + data.get("prompt_eval_duration", 0)
+            ) / _NANOSECONDS
+            eval_count = int(data.get("eval_count", 0))
+            eval_seconds = data.get("eval_duration", 0) / _NANOSECONDS
+        except (TypeError, ValueError):
+            return
+
+        if ttft > 0:
+            record_timing("llm_time_to_first_token", ttft)
+            if REGISTRY.enabled:
+                LLM_TTFT_SECONDS.observe(ttft)
+        if eval_count > 0 and eval_seconds > 0:
+            tokens_per_second = eval_count / eval_seconds
+            record_timing("llm_tokens_per_second", tokens_per_second)
+            if REGISTRY.enabled:
+                LLM_TOKENS_PER_SECOND.observe(tokens_per_second)
+                LLM_GENERATED_TOKENS.inc(eval_count)
+
+    def list_models(self, *, loaded_only: bool = False, timeout: float = 5.0) -> List[str]:
+        """
+        Return model names known to (or, with `loaded_only`, resident in) Ollama.
+
+        Raises `OllamaUnavailableError` if the endpoint does not answer.
+        """
+        endpoint = "/api/ps" if loaded_only else "/api/tags"
+        try:
+            response = requests.get(f"{self.base_url}{endpoint}", timeout=timeout)
+            response.raise_for_status()
+            models = response.json().get("models", [])
+        except (requests.RequestException, ValueError) as exc:
+            raise OllamaUnavailableError(
+                f"Ollama health probe failed for {self.base_url}"
+            ) from exc
+
+        return [model.get("name", "") for model in models if isinstance(model, dict)]
+
+    def has_model(self, names: List[str]) -> bool:
+        """Check whether this client's model appears in `names`."""
+        # Ollama reports "llama3" as "llama3:latest".
+        wanted = {self.model, f"{self.model}:latest"}
+        return any(name in wanted for name in names)
+
+    def warm_up(self) -> None:
+        """Load the model into memory without generating any tokens."""
+        payload: Dict[str, Any] = {"model": self.model, "prompt": "", "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+
+        logger.info("Warming up model %s on %s", self.model, self.base_url)
+        try:
+            response = requests.post(
+                self.api_url,
+                json=payload,
+                timeout=(10, self.timeout),
+            )
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise OllamaUnavailableError(
+                f"Failed to warm up {self.model} on {self.base_url}"
+            ) from exc
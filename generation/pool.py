@@ -0,0 +1,199 @@
+"""
+Load balancing and failover across several Ollama endpoints.
+
+Design goals:
+- Route each generation to the healthy endpoint with the fewest
+  outstanding requests, never exceeding a per-endpoint limit
+- Retry on another endpoint when one is unreachable
+- Probe endpoints periodically and keep the model loaded, so a cold model
+  is warmed by the health checker rather than by a user request
+"""
+
+import itertools
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from generation.llm_client import OllamaClient, OllamaUnavailableError
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class OllamaBackend:
+    """Routing state for a single Ollama endpoint."""
+
+    def __init__(self, client: OllamaClient) -> None:
+        self.client = client
+        self.healthy = True
+        self.outstanding = 0
+        self.failures = 0
+        self.model_loaded = False
+
+    @property
+    def url(self) -> str:
+        return self.client.base_url
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "failures": self.failures,
+            "model_loaded": self.model_loaded,
+        }
+
+
+class OllamaPool:
+    """
+    Drop-in replacement for `OllamaClient.generate` over several endpoints.
+
+    Only `OllamaUnavailableError` (connection refused, connect timeout,
+    HTTP 503) triggers failover; read timeouts and invalid responses are
+    raised immediately since retrying would repeat a long generation.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[OllamaClient],
+        *,
+        health_check_interval: float = 15.0,
+        warm_up: bool = True,
+        max_per_backend: Optional[int] = None,
+    ) -> None:
+        if not clients:
+            raise ValueError("OllamaPool requires at least one client")
+        if max_per_backend is not None and max_per_backend < 1:
+            raise ValueError("max_per_backend must be at least 1")
+
+        self.backends: List[OllamaBackend] = [OllamaBackend(c) for c in clients]
+        self.health_check_interval = health_check_interval
+        self.warm_up = warm_up
+        self.max_per_backend = max_per_backend
+
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._tiebreak = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ranked_locked(self) -> List[OllamaBackend]:
+        """Backends in routing order: healthy first, then least outstanding."""
+        offset = next(self._tiebreak)
+        count = len(self.backends)
+        rotated = [self.backends[(offset + i) % count] for i in range(count)]
+        return sorted(rotated, key=lambda b: (not b.healthy, b.outstanding))
+
+    def _acquire(self, tried: Set[int]) -> Optional[OllamaBackend]:
+        """
+        Reserve the best untried endpoint, waiting while all are saturated.
+
+        Unhealthy endpoints are only tried once no healthy one is left, so
+        the load of an endpoint that is down waits for capacity on the
+        healthy ones instead of piling onto them past `max_per_backend`.
+        """
+        with self._slot_freed:
+            while True:
+                untried = [b for b in self._ranked_locked() if id(b) not in tried]
+                if not untried:
+                    return None
+                healthy = [b for b in untried if b.healthy]
+                for backend in healthy or untried:
+                    if self.max_per_backend is None or backend.outstanding < self.max_per_backend:
+                        backend.outstanding += 1
+                        return backend
+                self._slot_freed.wait()
+
+    def _release(self, backend: OllamaBackend) -> None:
+        with self._slot_freed:
+            backend.outstanding -= 1
+            self._slot_freed.notify_all()
+
+    def generate(self, prompt: str) -> str:
+        """Generate on the best available endpoint, failing over as needed."""
+        last_error: Optional[Exception] = None
+        tried: Set[int] = set()
+
+        while True:
+            backend = self._acquire(tried)
+            if backend is None:
+                break
+            tried.add(id(backend))
+            try:
+                result = backend.client.generate(prompt)
+            except OllamaUnavailableError as exc:
+                self._mark_down(backend, exc)
+                last_error = exc
+                continue
+            finally:
+                self._release(backend)
+
+            with self._lock:
+                backend.healthy = True
+                backend.failures = 0
+                backend.model_loaded = True
+            return result
+
+        raise OllamaUnavailableError(
+            "Failed to communicate with Ollama: all endpoints unavailable"
+        ) from last_error
+
+    def _mark_down(self, backend: OllamaBackend, exc: Exception) -> None:
+        with self._lock:
+            backend.healthy = False
+            backend.failures += 1
+            backend.model_loaded = False
+        logger.warning("Ollama endpoint %s marked unhealthy: %s", backend.url, exc)
+
+    def check_health(self) -> None:
+        """Probe every endpoint once and warm up models that are not loaded."""
+        for backend in self.backends:
+            try:
+                loaded = backend.client.list_models(loaded_only=True)
+                model_loaded = backend.client.has_model(loaded)
+                if not model_loaded and self.warm_up:
+                    backend.client.warm_up()
+                    model_loaded = True
+            except OllamaUnavailableError as exc:
+                if backend.healthy:
+                    self._mark_down(backend, exc)
+                continue
+
+            with self._lock:
+                if not backend.healthy:
+                    logger.info("Ollama endpoint %s is healthy again", backend.url)
+                backend.healthy = True
+                backend.failures = 0
+                backend.model_loaded = model_loaded
+
+    def start(self) -> None:
+        """Start the background health checker (idempotent)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.check_health()
+                except Exception as exc:  # noqa: BLE001
+                    logger.error("Ollama health check failed: %s", exc)
+                self._stop.wait(self.health_check_interval)
+
+        self._thread = threading.Thread(
+            target=run,
+            name="ollama-health",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background health checker."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-endpoint routing state."""
+        with self._lock:
+            return [backend.snapshot() for backend in self.backends]
@@ -0,0 +1,249 @@
+"""
+Admission control for LLM generation.
+
+A local Ollama instance serves only a few generations at once. The
+scheduler sits in front of the client and:
+- Caps concurrent generations
+- Bounds the number of requests waiting for a slot, rejecting the rest
+- Coalesces identical in-flight prompts (one generation, many waiters)
+- Records queue-time metrics
+"""
+
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict
+
+from generation.llm_client import LLMClient
+from utils.logging import get_logger
+from utils.metrics import REGISTRY, record_timing
+
+logger = get_logger(__name__)
+
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "rag_llm_queue_wait_seconds",
+    "Time generation requests waited for a scheduler slot.",
+)
+REJECTIONS = REGISTRY.counter(
+    "rag_llm_rejections_total",
+    "Generation requests rejected by the scheduler.",
+    ("reason",),
+)
+
+
+class SchedulerOverloadedError(RuntimeError):
+    """Raised when a generation request cannot be admitted."""
+
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueueFullError(SchedulerOverloadedError):
+    """The wait queue is full; the request was rejected immediately."""
+
+
+class QueueTimeoutError(SchedulerOverloadedError):
+    """The request waited too long for a generation slot."""
+
+
+def _percentile(values: Deque[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class GenerationScheduler:
+    """
+    Thread-safe wrapper exposing the same `generate` interface as the client.
+
+    Intended to be shared by all request handlers in a process.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        *,
+        max_concurrency: int = 2,
+        max_queue: int = 8,
+        queue_timeout: float = 60.0,
+        retry_after: int = 5,
+        sample_size: int = 1000,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, "Future[str]"] = {}
+        self._active = 0
+        self._waiting = 0
+        self._followers = 0
+
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._coalesced = 0
+        self._queue_times: Deque[float] = deque(maxlen=sample_size)
+
+    @staticmethod
+    def _key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate text for `prompt`, waiting for a free slot if needed.
+
+        A request whose prompt is already being generated waits for that
+        result instead; it occupies a queue place while it waits.
+
+        Raises:
+            QueueFullError: If the wait queue is already full.
+            QueueTimeoutError: If no slot (or, for a coalesced request, no
+                answer) becomes available within `queue_timeout`.
+        """
+        key = self._key(prompt)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            # Requests joining an in-flight prompt hold a worker thread just
+            # like queued ones, so they count against the same bound.
+            occupied = self._active + self._waiting + self._followers
+            if occupied >= self.max_concurrency + self.max_queue:
+                self._rejected += 1
+                if REGISTRY.enabled:
+                    REJECTIONS.inc(reason="queue_full")
+                logger.warning(
+                    "LLM queue full (active=%d, waiting=%d, coalesced=%d); rejecting request",
+                    self._active,
+                    self._waiting,
+                    self._followers,
+                )
+                raise QueueFullError(
+                    "LLM generation queue is full", self.retry_after
+                )
+            if future is not None:
+                self._coalesced += 1
+                self._followers += 1
+                leader = False
+            else:
+                future = Future()
+                self._inflight[key] = future
+                self._waiting += 1
+                leader = True
+
+        if not leader:
+            logger.info("Coalescing identical in-flight prompt")
+            return self._follow(future)
+
+        return self._run(key, prompt, future)
+
+    def _follow(self, future: "Future[str]") -> str:
+        """Wait for an identical in-flight generation, up to `queue_timeout`."""
+        try:
+            return future.result(timeout=self.queue_timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            if REGISTRY.enabled:
+                REJECTIONS.inc(reason="queue_timeout")
+            logger.warning(
+                "Coalesced LLM request got no answer within %.1fs",
+                self.queue_timeout,
+            )
+            raise QueueTimeoutError(
+                f"No LLM answer became available within {self.queue_timeout}s",
+                self.retry_after,
+            ) from None
+        finally:
+            with self._lock:
+                self._followers -= 1
+
+    def _run(self, key: str, prompt: str, future: "Future[str]") -> str:
+        enqueued = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        waited = time.monotonic() - enqueued
+        record_timing("llm_queue_wait", waited)
+        if REGISTRY.enabled:
+            QUEUE_WAIT_SECONDS.observe(waited)
+
+        with self._lock:
+            self._waiting -= 1
+            self._queue_times.append(waited)
+            if acquired:
+                self._active += 1
+            else:
+                self._timed_out += 1
+                if REGISTRY.enabled:
+                    REJECTIONS.inc(reason="queue_timeout")
+                self._inflight.pop(key, None)
+
+        if not acquired:
+            logger.warning("LLM request waited %.1fs without a free slot", waited)
+            error = QueueTimeoutError(
+                f"No LLM generation slot became free within {self.queue_timeout}s",
+                self.retry_after,
+            )
+            future.set_exception(error)
+            raise error
+
+        if waited > 0.01:
+            logger.info("LLM request queued for %.2fs", waited)
+
+        try:
+            result = self.client.generate(prompt)
+        except BaseException as exc:
+            with self._lock:
+                self._failed += 1
+            future.set_exception(exc)
+            raise
+        else:
+            with self._lock:
+                self._completed += 1
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._inflight.pop(key, None)
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue state and queue-time statistics (seconds)."""
+        with self._lock:
+            queue_times = deque(self._queue_times)
+            snapshot: Dict[str, Any] = {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "waiting": self._waiting,
+                "coalesced_waiting": self._followers,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "coalesced": self._coalesced,
+            }
+
+        snapshot["queue_time"] = {
+            "samples": len(queue_times),
+            "mean": sum(queue_times) / len(queue_times) if queue_times else 0.0,
+            "p50": _percentile(queue_times, 0.50),
+            "p95": _percentile(queue_times, 0.95),
+            "max": max(queue_times, default=0.0),
+        }
+        return snapshot
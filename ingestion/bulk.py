@@ -0,0 +1,503 @@
+"""
+Resumable bulk ingestion with checkpoints.
+
+Files are processed in batches. Each batch is parsed and chunked in a
+process pool (the next batch is parsed while the current one is being
+embedded), deduplicated, embedded and saved as a FAISS shard in a
+checkpoint directory, followed by a progress manifest listing the
+finished shards. An interrupted run resumes from the last completed
+batch instead of starting over. When every file is done the shards are
+merged and the index is written to the configured vector store path.
+
+Usage:
+    python -m ingestion.bulk --data-dir /mnt/corpus --batch-files 200
+    python -m ingestion.bulk --restart          # discard the checkpoint
+"""
+
+import argparse
+import json
+import os
+import shutil
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from config.settings import get_settings
+from ingestion.chunker import chunk_documents
+from ingestion.dedup import DuplicateIndex
+from ingestion.indexer import create_embedding_model
+from ingestion.loader import list_supported_files, load_file
+from retrieval.retriever import clear_search_params
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 2
+PARTIAL_SUFFIX = ".part"
+DEDUP_STATE_NAME = "dedup.json"
+SIGNATURES_NAME = "signatures.npy"
+
+# (relative path, chunks, error message)
+ParsedFile = Tuple[str, List[Document], Optional[str]]
+
+
+@dataclass
+class BulkIngestResult:
+    """Outcome of a bulk ingestion run."""
+
+    index_path: Optional[Path]
+    completed: bool
+    files_total: int
+    files_done: int
+    files_failed: int
+    chunks_indexed: int
+    batches_run: int
+
+
+@dataclass
+class _ShardDedup:
+    """Deduplication state added by one batch."""
+
+    # Normalized-text hash -> key of the chunk it collapses into.
+    exact: Dict[str, str]
+    # Key -> MinHash signature of each chunk kept by the batch.
+    signatures: Dict[str, np.ndarray]
+    # Key of a chunk kept by an earlier batch -> references to its new duplicates.
+    duplicate_sources: Dict[str, List[Dict[str, Any]]]
+
+
+def default_checkpoint_dir(index_path: Path) -> Path:
+    """Checkpoints live next to the index, e.g. `faiss_index.bulk/`."""
+    return index_path.with_name(index_path.name + ".bulk")
+
+
+def _parse_file(
+    file_path: str,
+    relative_path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+) -> ParsedFile:
+    """Load and chunk one file (runs in a worker process)."""
+    try:
+        documents = load_file(Path(file_path))
+        chunks = chunk_documents(
+            documents,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+        return relative_path, chunks, None
+    except Exception as exc:  # noqa: BLE001
+        return relative_path, [], str(exc)
+
+
+class _Checkpoint:
+    """
+    Progress manifest plus one append-only index shard per batch.
+
+    Each batch's chunks are saved as a small FAISS index under
+    `shards/<name>/`, then the manifest listing the finished shards is
+    replaced atomically. Checkpointing a batch therefore costs I/O in
+    proportion to that batch rather than to everything indexed so far;
+    the shards are merged once, when the run completes.
+
+    With deduplication on, each shard also holds the hashes and MinHash
+    signatures its batch added, so later batches (and resumed runs) are
+    deduplicated against everything indexed before them.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.shards = directory / "shards"
+        self._manifest = directory / MANIFEST_NAME
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self._manifest.exists():
+            return None
+        manifest = json.loads(self._manifest.read_text(encoding="utf-8"))
+
+        # A shard the manifest doesn't list belongs to a batch that was
+        # interrupted before it was recorded; that batch is redone.
+        listed = set(manifest.get("shards", []))
+        if self.shards.exists():
+            for path in self.shards.iterdir():
+                if path.name not in listed:
+                    shutil.rmtree(path, ignore_errors=True)
+        return manifest
+
+    def save_shard(
+        self,
+        name: str,
+        store: Optional[FAISS],
+        dedup: Optional[_ShardDedup] = None,
+    ) -> None:
+        partial = self.shards / f"{name}{PARTIAL_SUFFIX}"
+        final = self.shards / name
+        shutil.rmtree(partial, ignore_errors=True)
+        shutil.rmtree(final, ignore_errors=True)
+        partial.mkdir(parents=True)
+        if store is not None:
+            store.save_local(partial.as_posix())
+        if dedup is not None:
+            state = {
+                "exact": dedup.exact,
+                "signature_keys": list(dedup.signatures),
+                "duplicate_sources": dedup.duplicate_sources,
+            }
+            (partial / DEDUP_STATE_NAME).write_text(json.dumps(state), encoding="utf-8")
+            if dedup.signatures:
+                np.save(partial / SIGNATURES_NAME, np.stack(list(dedup.signatures.values())))
+        partial.rename(final)
+
+    def restore_dedup(self, names: Sequence[str], index: DuplicateIndex) -> None:
+        """Load the listed shards' deduplication state into `index`."""
+        for name in names:
+            state = self._dedup_state(name)
+            if state is None:
+                continue
+            signatures: Dict[str, np.ndarray] = {}
+            if state["signature_keys"]:
+                matrix = np.load(self.shards / name / SIGNATURES_NAME)
+                signatures = dict(zip(state["signature_keys"], matrix))
+            index.restore(state["exact"], signatures)
+
+    def save(self, manifest: Dict[str, Any]) -> None:
+        manifest["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        partial = self._manifest.with_name(f"{MANIFEST_NAME}{PARTIAL_SUFFIX}")
+        partial.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(partial, self._manifest)
+
+    def merge(self, names: Sequence[str], embeddings: Embeddings) -> Optional[FAISS]:
+        """Load the listed shards, in order, into a single index."""
+        store: Optional[FAISS] = None
+        for name in names:
+            path = self.shards / name
+            if not (path / "index.faiss").exists():
+                continue
+            shard = FAISS.load_local(
+                path.as_posix(),
+                embeddings,
+                allow_dangerous_deserialization=True,
+            )
+            if store is None:
+                store = shard
+            else:
+                store.merge_from(shard)
+        if store is None:
+            return None
+
+        # Duplicates found after their representative's shard was written.
+        for name in names:
+            state = self._dedup_state(name) or {}
+            for key, refs in state.get("duplicate_sources", {}).items():
+                document = store.docstore.search(key)
+                if isinstance(document, Document):
+                    document.metadata.setdefault("duplicate_sources", []).extend(refs)
+        return store
+
+    def _dedup_state(self, name: str) -> Optional[Dict[str, Any]]:
+        path = self.shards / name / DEDUP_STATE_NAME
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _submit_batch(
+    executor: Optional[Executor],
+    files: Sequence[Path],
+    data_dir: Path,
+    chunk_size: int,
+    chunk_overlap: int,
+) -> List[Any]:
+    """Start parsing a batch; returns futures, or results when run inline."""
+    jobs = [
+        (path.as_posix(), path.relative_to(data_dir).as_posix(), chunk_size, chunk_overlap)
+        for path in files
+    ]
+    if executor is None:
+        return [_parse_file(*job) for job in jobs]
+    return [executor.submit(_parse_file, *job) for job in jobs]
+
+
+def _collect(pending: List[Any]) -> List[ParsedFile]:
+    return [item.result() if isinstance(item, Future) else item for item in pending]
+
+
+def _chunk_key(chunk: Document) -> str:
+    """Docstore id of a chunk; also its key in the duplicate index."""
+    return str(chunk.metadata["chunk_id"])
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+def run_bulk_ingest(
+    data_dir: Path,
+    index_path: Path,
+    embeddings: Embeddings,
+    *,
+    model_name: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    dedup: bool = True,
+    checkpoint_dir: Optional[Path] = None,
+    batch_files: int = 100,
+    workers: Optional[int] = None,
+    restart: bool = False,
+    max_batches: Optional[int] = None,
+    keep_checkpoint: bool = False,
+) -> BulkIngestResult:
+    """
+    Ingest `data_dir` in checkpointed batches.
+
+    Args:
+        model_name: Recorded in the manifest; a checkpoint made with a
+            different model or chunking is refused unless `restart`.
+        workers: Parser processes (default: all cores); 1 parses inline.
+        restart: Discard any existing checkpoint first.
+        max_batches: Stop after this many batches, leaving the checkpoint
+            for a later run.
+        keep_checkpoint: Keep the checkpoint directory after completion.
+
+    Returns:
+        A summary; `index_path` is set only when every file was processed.
+    """
+    settings = get_settings()
+    checkpoint = _Checkpoint(checkpoint_dir or default_checkpoint_dir(index_path))
+    if restart:
+        checkpoint.clear()
+
+    config = {
+        "data_dir": str(data_dir.resolve()),
+        "embedding_model": model_name,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "dedup": {
+            "similarity_threshold": settings.dedup_similarity_threshold,
+            "num_perm": settings.dedup_num_perm,
+            "bands": settings.dedup_lsh_bands,
+        } if dedup else False,
+    }
+    manifest = checkpoint.load()
+    if manifest is None:
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "config": config,
+            "completed_files": [],
+            "failed_files": {},
+            "chunks_indexed": 0,
+            "next_chunk_id": 0,
+            "batches": 0,
+            "shards": [],
+        }
+    elif manifest.get("version") != MANIFEST_VERSION or manifest.get("config") != config:
+        raise ValueError(
+            f"Checkpoint in {checkpoint.directory} was made with different settings "
+            f"({manifest.get('config')}); rerun with --restart to discard it."
+        )
+    else:
+        logger.info(
+            "Resuming from checkpoint: %d files, %d chunks already indexed",
+            len(manifest["completed_files"]) + len(manifest["failed_files"]),
+            manifest["chunks_indexed"],
+        )
+
+    duplicates: Optional[DuplicateIndex] = None
+    if dedup:
+        duplicates = DuplicateIndex(
+            similarity_threshold=settings.dedup_similarity_threshold,
+            num_perm=settings.dedup_num_perm,
+            bands=settings.dedup_lsh_bands,
+        )
+        checkpoint.restore_dedup(manifest["shards"], duplicates)
+
+    all_files = list_supported_files(data_dir) if data_dir.exists() else []
+    finished = set(manifest["completed_files"]) | set(manifest["failed_files"])
+    remaining = [path for path in all_files if path.relative_to(data_dir).as_posix() not in finished]
+    batches = [remaining[i:i + batch_files] for i in range(0, len(remaining), batch_files)]
+    if max_batches is not None:
+        batches = batches[:max_batches]
+
+    logger.info(
+        "%d files: %d already done, %d to go in %d batch(es)",
+        len(all_files),
+        len(all_files) - len(remaining),
+        len(remaining),
+        len(batches),
+    )
+
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and batches else None
+    run_start = perf_counter()
+    run_files = run_chunks = 0
+
+    try:
+        pending = (
+            _submit_batch(executor, batches[0], data_dir, chunk_size, chunk_overlap)
+            if batches
+            else []
+        )
+        for number, _batch in enumerate(batches):
+            batch_start = perf_counter()
+            parsed = _collect(pending)
+            # Overlap parsing of the next batch with embedding this one.
+            if number + 1 < len(batches):
+                pending = _submit_batch(
+                    executor, batches[number + 1], data_dir, chunk_size, chunk_overlap
+                )
+
+            chunks: List[Document] = []
+            completed: List[str] = []
+            for relative_path, file_chunks, error in parsed:
+                if error is not None:
+                    logger.error("Failed to load file %s due to error: %s", relative_path, error)
+                    manifest["failed_files"][relative_path] = error
+                    continue
+                completed.append(relative_path)
+                chunks.extend(file_chunks)
+
+            # Chunk ids must stay unique across batches and runs.
+            for offset, chunk in enumerate(chunks):
+                chunk.metadata["chunk_id"] = manifest["next_chunk_id"] + offset
+            manifest["next_chunk_id"] += len(chunks)
+
+            # Duplicates of chunks from earlier batches are not embedded
+            # again; their sources are attached to the existing chunk.
+            shard_dedup = None
+            if duplicates is not None:
+                chunks, earlier, _stats = duplicates.deduplicate(chunks, key=_chunk_key)
+                exact, signatures = duplicates.pop_new_entries()
+                shard_dedup = _ShardDedup(exact, signatures, earlier)
+
+            shard = None
+            if chunks:
+                texts = [chunk.page_content for chunk in chunks]
+                vectors = embeddings.embed_documents(texts)
+                metadatas = [chunk.metadata for chunk in chunks]
+                shard = FAISS.from_embeddings(
+                    zip(texts, vectors),
+                    embeddings,
+                    metadatas=metadatas,
+                    ids=[_chunk_key(chunk) for chunk in chunks],
+                )
+
+            shard_name = f"batch_{manifest['batches'] + 1:05d}"
+            checkpoint.save_shard(shard_name, shard, shard_dedup)
+            manifest["shards"].append(shard_name)
+            manifest["completed_files"].extend(completed)
+            manifest["chunks_indexed"] += len(chunks)
+            manifest["batches"] += 1
+            checkpoint.save(manifest)
+
+            run_files += len(parsed)
+            run_chunks += len(chunks)
+            batch_seconds = perf_counter() - batch_start
+            run_seconds = perf_counter() - run_start
+            done = len(manifest["completed_files"]) + len(manifest["failed_files"])
+            logger.info(
+                "Batch %d/%d: %d/%d files, %d chunks | %.1f docs/s, %.1f chunks/s "
+                "(run avg %.1f docs/s, %.1f chunks/s)",
+                number + 1,
+                len(batches),
+                done,
+                len(all_files),
+                manifest["chunks_indexed"],
+                _rate(len(parsed), batch_seconds),
+                _rate(len(chunks), batch_seconds),
+                _rate(run_files, run_seconds),
+                _rate(run_chunks, run_seconds),
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    files_done = len(manifest["completed_files"]) + len(manifest["failed_files"])
+    result = BulkIngestResult(
+        index_path=None,
+        completed=files_done >= len(all_files),
+        files_total=len(all_files),
+        files_done=files_done,
+        files_failed=len(manifest["failed_files"]),
+        chunks_indexed=manifest["chunks_indexed"],
+        batches_run=len(batches),
+    )
+    if not result.completed:
+        return result
+
+    store = checkpoint.merge(manifest["shards"], embeddings)
+    if store is None:
+        raise ValueError(
+            "No documents were loaded. "
+            "Ensure the data directory exists and contains supported files."
+        )
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    logger.info("Saving FAISS index to %s", index_path)
+    store.save_local(index_path.as_posix())
+    clear_search_params(index_path)
+    if not keep_checkpoint:
+        checkpoint.clear()
+
+    result.index_path = index_path
+    return result
+
+
+def main(argv: Optional[list] = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data-dir", type=Path, default=settings.data_dir)
+    parser.add_argument("--index-path", type=Path, default=settings.vector_store_path)
+    parser.add_argument("--checkpoint-dir", type=Path, help="Default: <index-path>.bulk")
+    parser.add_argument("--batch-files", type=int, default=100, help="Files per checkpointed batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Parser processes")
+    parser.add_argument("--max-batches", type=int, help="Stop after this many batches")
+    parser.add_argument("--restart", action="store_true", help="Discard any existing checkpoint")
+    parser.add_argument("--keep-checkpoint", action="store_true", help="Keep the checkpoint after completion")
+    args = parser.parse_args(argv)
+
+    embeddings = create_embedding_model(
+        settings.embedding_model_name,
+        settings.embedding_batch_size,
+    )
+    try:
+        result = run_bulk_ingest(
+            args.data_dir,
+            args.index_path,
+            embeddings,
+            model_name=settings.embedding_model_name,
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+            dedup=settings.dedup_enabled,
+            checkpoint_dir=args.checkpoint_dir,
+            batch_files=args.batch_files,
+            workers=args.workers,
+            restart=args.restart,
+            max_batches=args.max_batches,
+            keep_checkpoint=args.keep_checkpoint,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+
+    if not result.completed:
+        print(f"Stopped with {result.files_total - result.files_done} files left; rerun to resume.")
+        return
+    print(
+        f"Indexed {result.chunks_indexed} chunks from {result.files_done} files "
+        f"({result.files_failed} failed) into {result.index_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
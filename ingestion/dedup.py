@@ -0,0 +1,294 @@
+"""
+Duplicate and near-duplicate chunk elimination.
+
+Runs between chunking and embedding:
+- Identical chunks (after whitespace/case normalization) are matched by hash
+- Near-identical chunks are matched with MinHash signatures bucketed by LSH
+- Each group collapses into its first chunk; the other members' source
+  references are kept in `duplicate_sources` so citations stay complete
+"""
+
+import hashlib
+import itertools
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+@dataclass
+class DedupStats:
+    """Summary of how much a deduplication pass shrank the chunk set."""
+
+    input_chunks: int
+    output_chunks: int
+    exact_duplicates: int
+    near_duplicates: int
+
+    @property
+    def removed(self) -> int:
+        return self.input_chunks - self.output_chunks
+
+    @property
+    def reduction_ratio(self) -> float:
+        if not self.input_chunks:
+            return 0.0
+        return self.removed / self.input_chunks
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace so trivial differences are ignored."""
+    return " ".join(text.lower().split())
+
+
+def _shingles(text: str, size: int) -> Set[bytes]:
+    """Word n-gram shingles; short texts fall back to a single shingle."""
+    words = re.findall(r"\w+", text)
+    if len(words) < size:
+        return {" ".join(words).encode("utf-8")} if words else set()
+    return {
+        " ".join(words[i:i + size]).encode("utf-8")
+        for i in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures with seeded permutations."""
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        *,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        generator = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = generator.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Return the signature of `text`, or None if it has no words."""
+        shingles = _shingles(text, self.shingle_size)
+        if not shingles:
+            return None
+
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(s, digest_size=4).digest(), "little")
+                for s in shingles
+            ),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # Universal hashing (a*x + b) mod p; uint64 wraparound is intended.
+        with np.errstate(over="ignore"):
+            permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=1)
+
+
+def _source_ref(doc: Document) -> Dict[str, object]:
+    """Minimal metadata needed to cite a collapsed chunk."""
+    keys = ("source", "page", "chunk_id")
+    return {key: doc.metadata[key] for key in keys if key in doc.metadata}
+
+
+def _duplicate_refs(duplicate: Document) -> List[Dict[str, object]]:
+    """References to `duplicate` and to anything already merged into it."""
+    return [_source_ref(duplicate), *duplicate.metadata.get("duplicate_sources", [])]
+
+
+def _merge_into(representative: Document, duplicate: Document) -> None:
+    refs = representative.metadata.setdefault("duplicate_sources", [])
+    refs.extend(_duplicate_refs(duplicate))
+
+
+class DuplicateIndex:
+    """
+    Exact-hash and MinHash/LSH lookup of the chunks kept so far.
+
+    Kept chunks are identified by caller-chosen string keys rather than
+    held in memory, so one index can span many `deduplicate` calls. Bulk
+    ingestion keeps one across batches and persists the entries each
+    batch adds (see `pop_new_entries` / `restore`).
+
+    Args:
+        similarity_threshold: Minimum estimated Jaccard similarity of word
+            shingles for two chunks to count as near-duplicates. Values of
+            1.0 or more disable near-duplicate matching (exact only).
+        num_perm: MinHash signature length.
+        bands: Number of LSH bands; `num_perm` must be divisible by it.
+    """
+
+    def __init__(
+        self,
+        *,
+        similarity_threshold: float = 0.9,
+        num_perm: int = 128,
+        bands: int = 16,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.similarity_threshold = similarity_threshold
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm) if similarity_threshold < 1.0 else None
+
+        self._exact: Dict[str, str] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self._new_exact: Dict[str, str] = {}
+        self._new_signatures: Dict[str, np.ndarray] = {}
+
+    def deduplicate(
+        self,
+        chunks: Iterable[Document],
+        key: Callable[[Document], str],
+    ) -> Tuple[List[Document], Dict[str, List[Dict[str, object]]], DedupStats]:
+        """
+        Collapse `chunks` against each other and against earlier calls.
+
+        Args:
+            chunks: Chunked documents, in ingestion order.
+            key: Unique key under which a kept chunk is indexed.
+
+        Returns:
+            The kept chunks (first occurrence of each new group); for
+            chunks kept by earlier calls, the source references of their
+            new duplicates, by key; and stats.
+        """
+        kept: Dict[str, Document] = {}
+        earlier: Dict[str, List[Dict[str, object]]] = {}
+        total = exact = near = 0
+
+        for chunk in chunks:
+            total += 1
+            normalized = normalize_text(chunk.page_content)
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+            match = self._exact.get(digest)
+            if match is not None:
+                exact += 1
+            else:
+                signature = self._hasher.signature(normalized) if self._hasher else None
+                match = self._near_match(signature)
+                if match is None:
+                    chunk_key = key(chunk)
+                    kept[chunk_key] = chunk
+                    self._add_exact(digest, chunk_key)
+                    if signature is not None:
+                        self._add_signature(chunk_key, signature)
+                        self._new_signatures[chunk_key] = signature
+                    continue
+                self._add_exact(digest, match)
+                near += 1
+
+            if match in kept:
+                _merge_into(kept[match], chunk)
+            else:
+                earlier.setdefault(match, []).extend(_duplicate_refs(chunk))
+
+        stats = DedupStats(
+            input_chunks=total,
+            output_chunks=len(kept),
+            exact_duplicates=exact,
+            near_duplicates=near,
+        )
+        logger.info(
+            "Deduplicated %d -> %d chunks (%d exact, %d near duplicates, %.1f%% smaller)",
+            stats.input_chunks,
+            stats.output_chunks,
+            stats.exact_duplicates,
+            stats.near_duplicates,
+            stats.reduction_ratio * 100,
+        )
+        return list(kept.values()), earlier, stats
+
+    def pop_new_entries(self) -> Tuple[Dict[str, str], Dict[str, np.ndarray]]:
+        """
+        Return the entries added since the last call and forget them.
+
+        Returns:
+            Normalized-text hash -> key, and key -> MinHash signature.
+        """
+        entries = (self._new_exact, self._new_signatures)
+        self._new_exact, self._new_signatures = {}, {}
+        return entries
+
+    def restore(self, exact: Dict[str, str], signatures: Dict[str, np.ndarray]) -> None:
+        """Re-add entries saved from `pop_new_entries`."""
+        self._exact.update(exact)
+        for chunk_key, signature in signatures.items():
+            self._add_signature(chunk_key, signature)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        rows = self._rows
+        return [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _near_match(self, signature: Optional[np.ndarray]) -> Optional[str]:
+        if signature is None:
+            return None
+        seen: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            for candidate in self._buckets.get(band_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.similarity_threshold:
+                    return candidate
+        return None
+
+    def _add_exact(self, digest: str, chunk_key: str) -> None:
+        self._exact[digest] = chunk_key
+        self._new_exact[digest] = chunk_key
+
+    def _add_signature(self, chunk_key: str, signature: np.ndarray) -> None:
+        self._signatures[chunk_key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, []).append(chunk_key)
+
+
+def deduplicate_chunks(
+    chunks: Iterable[Document],
+    *,
+    similarity_threshold: float = 0.9,
+    num_perm: int = 128,
+    bands: int = 16,
+) -> Tuple[List[Document], DedupStats]:
+    """
+    Collapse identical and near-identical chunks.
+
+    Args:
+        chunks: Chunked documents, in ingestion order.
+        similarity_threshold: Minimum estimated Jaccard similarity of word
+            shingles for two chunks to count as near-duplicates. Values of
+            1.0 or more disable near-duplicate matching (exact only).
+        num_perm: MinHash signature length.
+        bands: Number of LSH bands; `num_perm` must be divisible by it.
+
+    Returns:
+        The surviving chunks (first occurrence of each group) and stats.
+    """
+    index = DuplicateIndex(
+        similarity_threshold=similarity_threshold,
+        num_perm=num_perm,
+        bands=bands,
+    )
+    positions = itertools.count()
+    kept, _earlier, stats = index.deduplicate(chunks, key=lambda _chunk: str(next(positions)))
+    return kept, stats
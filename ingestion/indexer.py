@@ -8,8 +8,11 @@ from langchain_community.vectorstores import FAISS
 
 from config.settings import get_settings
 from ingestion.chunker import chunk_documents
+from ingestion.dedup import deduplicate_chunks
 from ingestion.loader import load_documents
+from retrieval.retriever import clear_search_params
 from utils.logging import get_logger
+from utils.metrics import timed
 
 logger = get_logger(__name__)
 
@@ -43,21 +46,32 @@ def build_and_persist_index(
 
     logger.info("Starting ingestion from directory: %s", source_dir)
 
-    documents = load_documents(source_dir)
+    with timed("ingest_load"):
+        documents = load_documents(source_dir)
     if not documents:
         raise ValueError(
             "No documents were loaded. "
             "Ensure the data directory exists and contains supported files."
         )
 
-    chunked_docs = chunk_documents(
-        documents,
-        chunk_size=settings.chunk_size,
-        chunk_overlap=settings.chunk_overlap,
-    )
+    with timed("ingest_chunk"):
+        chunked_docs = chunk_documents(
+            documents,
+            chunk_size=settings.chunk_size,
+            chunk_overlap=settings.chunk_overlap,
+        )
     if not chunked_docs:
         raise ValueError("Document chunking produced no chunks.")
 
+    if settings.dedup_enabled:
+        with timed("ingest_dedup"):
+            chunked_docs, _stats = deduplicate_chunks(
+                chunked_docs,
+                similarity_threshold=settings.dedup_similarity_threshold,
+                num_perm=settings.dedup_num_perm,
+                bands=settings.dedup_lsh_bands,
+            )
+
     logger.info(
         "Creating embeddings using model: %s",
         settings.embedding_model_name,
@@ -67,17 +81,29 @@ def build_and_persist_index(
         settings.embedding_batch_size,
     )
 
+    texts = [doc.page_content for doc in chunked_docs]
+    logger.info("Embedding %d chunks", len(texts))
+    with timed("ingest_embed"):
+        vectors = embeddings.embed_documents(texts)
+
     logger.info(
         "Building FAISS index from %d chunks",
         len(chunked_docs),
     )
-    vector_store = FAISS.from_documents(chunked_docs, embeddings)
+    with timed("ingest_index"):
+        vector_store = FAISS.from_embeddings(
+            zip(texts, vectors),
+            embeddings,
+            metadatas=[doc.metadata for doc in chunked_docs],
+        )
 
     index_path = settings.vector_store_path
     index_path.parent.mkdir(parents=True, exist_ok=True)
 
     logger.info("Saving FAISS index to %s", index_path)
-    vector_store.save_local(index_path.as_posix())
+    with timed("ingest_persist"):
+        vector_store.save_local(index_path.as_posix())
+    clear_search_params(index_path)
 
     logger.info("Ingestion complete")
     return index_path
\ No newline at end of file
@@ -13,6 +13,43 @@ logger = get_logger(__name__)
 SUPPORTED_EXTENSIONS = {".pdf", ".txt", ".md"}
 
 
+def list_supported_files(data_dir: Path) -> List[Path]:
+    """Return supported files under `data_dir`, in a stable order."""
+    files: List[Path] = []
+    for file_path in sorted(data_dir.rglob("*")):
+        if not file_path.is_file():
+            continue
+        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+            logger.debug("Skipping unsupported file: %s", file_path)
+            continue
+        files.append(file_path)
+    return files
+
+
+def load_file(file_path: Path) -> List[Document]:
+    """
+    Load a single supported file.
+
+    Raises whatever the underlying loader raises on unreadable input.
+    """
+    if file_path.suffix.lower() == ".pdf":
+        loader = PyPDFLoader(file_path.as_posix())
+    else:
+        loader = TextLoader(
+            file_path.as_posix(),
+            encoding="utf-8",
+            autodetect_encoding=True,
+        )
+    loaded_docs = loader.load()
+
+    for doc in loaded_docs:
+        if doc.metadata is None:
+            doc.metadata = {}
+        doc.metadata.setdefault("source", file_path.name)
+        doc.metadata.setdefault("path", str(file_path))
+    return loaded_docs
+
+
 def load_documents(data_dir: Path) -> List[Document]:
     """
     Load supported documents from a directory.
@@ -28,32 +65,9 @@ def load_documents(data_dir: Path) -> List[Document]:
         )
         return documents
 
-    for file_path in data_dir.rglob("*"):
-        if not file_path.is_file():
-            continue
-
-        if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-            logger.debug("Skipping unsupported file: %s", file_path)
-            continue
-
+    for file_path in list_supported_files(data_dir):
         try:
-            if file_path.suffix.lower() == ".pdf":
-                loader = PyPDFLoader(file_path.as_posix())
-                loaded_docs = loader.load()
-            else:
-                loader = TextLoader(
-                    file_path.as_posix(),
-                    encoding="utf-8",
-                    autodetect_encoding=True,
-                )
-                loaded_docs = loader.load()
-
-            for doc in loaded_docs:
-                if doc.metadata is None:
-                    doc.metadata = {}
-                doc.metadata.setdefault("source", file_path.name)
-                doc.metadata.setdefault("path", str(file_path))
-
+            loaded_docs = load_file(file_path)
             documents.extend(loaded_docs)
             logger.info(
                 "Loaded %d document(s) from %s",
@@ -69,4 +83,4 @@ def load_documents(data_dir: Path) -> List[Document]:
             )
 
     logger.info("Total documents loaded: %d", len(documents))
-    return documents
\ No newline at end of file
+    return documents
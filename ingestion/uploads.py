@@ -0,0 +1,322 @@
+"""Streaming storage for uploaded documents with content-hash deduplication."""
+
+import hashlib
+import json
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from ingestion.loader import SUPPORTED_EXTENSIONS
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_NAME = ".upload_manifest.json"
+PARTIAL_SUFFIX = ".part"
+BACKUP_SUFFIX = ".bak"
+
+# Uploads for the same data directory may run in parallel worker threads;
+# the manifest read-modify-write must be serialized.
+_MANIFEST_LOCK = threading.Lock()
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an uploaded file exceeds the configured size limit."""
+
+
+@dataclass
+class StoredUpload:
+    """Outcome of storing a single uploaded file."""
+
+    filename: str
+    sha256: str
+    size: int
+    duplicate_of: Optional[str] = None
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.duplicate_of is not None
+
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    hasher = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def sanitize_filename(filename: Optional[str]) -> str:
+    """Strip directory components from a client-supplied filename."""
+    name = Path(filename or "").name.strip()
+    if not name or name.startswith("."):
+        raise ValueError(f"Invalid upload filename: {filename!r}")
+    return name
+
+
+class UploadStore:
+    """
+    Writes uploads into the data directory.
+
+    Bodies are copied in fixed-size chunks and hashed while writing, so
+    files are never held in memory and identical content already present
+    in the data directory is detected without a second read. Methods are
+    blocking and intended to run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        *,
+        max_file_bytes: int,
+        chunk_size: int = 1024 * 1024,
+    ) -> None:
+        self.data_dir = data_dir
+        self.max_file_bytes = max_file_bytes
+        self.chunk_size = chunk_size
+        self.manifest_path = data_dir / MANIFEST_NAME
+
+    def batch(self) -> "UploadBatch":
+        """Start an all-or-nothing batch of uploads."""
+        return UploadBatch(self)
+
+    def save(self, source: BinaryIO, filename: Optional[str]) -> StoredUpload:
+        """
+        Stream `source` to disk and register it in the manifest.
+
+        Returns a `StoredUpload` whose `duplicate_of` is set (and nothing is
+        written) when identical content is already stored.
+        """
+        batch = self.batch()
+        try:
+            upload = batch.add(source, filename)
+            batch.commit()
+        except BaseException:
+            batch.rollback()
+            raise
+        batch.finish()
+        return upload
+
+    def _stage(self, source: BinaryIO, name: str) -> Tuple[Path, str, int]:
+        """Stream `source` to a hidden partial file; return (path, sha256, size)."""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        partial_path = self.data_dir / f".{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+        hasher = hashlib.sha256()
+        size = 0
+
+        try:
+            with partial_path.open("wb") as buffer:
+                for chunk in iter(lambda: source.read(self.chunk_size), b""):
+                    size += len(chunk)
+                    if size > self.max_file_bytes:
+                        raise UploadTooLargeError(
+                            f"{name} exceeds the {self.max_file_bytes} byte upload limit"
+                        )
+                    hasher.update(chunk)
+                    buffer.write(chunk)
+
+            if size == 0:
+                raise ValueError(f"{name} is empty")
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        return partial_path, hasher.hexdigest(), size
+
+    def _load_manifest(self) -> Dict[str, str]:
+        """
+        Load the manifest (relative file name -> SHA-256), reconciled
+        against the data directory.
+
+        Entries for deleted files are dropped and supported files added
+        outside the upload path are hashed, so duplicates are detected
+        against everything that ingestion will actually see. Newly hashed
+        files are written back straight away so they are never hashed
+        twice. Callers must hold `_MANIFEST_LOCK`.
+        """
+        stored: Dict[str, str] = {}
+        if self.manifest_path.exists():
+            try:
+                data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                if "files" in data:
+                    stored = data["files"]
+                else:
+                    # Earlier manifests mapped hash -> name.
+                    stored = {name: sha for sha, name in data.items()}
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring unreadable upload manifest: %s", exc)
+
+        files = {
+            name: sha
+            for name, sha in stored.items()
+            if (self.data_dir / name).is_file()
+        }
+
+        for file_path in self.data_dir.rglob("*"):
+            if not file_path.is_file():
+                continue
+            if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            relative = file_path.relative_to(self.data_dir).as_posix()
+            if relative not in files:
+                files[relative] = hash_file(file_path, self.chunk_size)
+
+        if files != stored:
+            self._write_manifest(files)
+        return files
+
+    def _write_manifest(self, files: Dict[str, str]) -> None:
+        """Atomically persist the manifest."""
+        tmp_path = self.manifest_path.with_suffix(PARTIAL_SUFFIX)
+        tmp_path.write_text(
+            json.dumps({"files": files}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        tmp_path.replace(self.manifest_path)
+
+
+def _by_hash(files: Dict[str, str]) -> Dict[str, str]:
+    """Invert a manifest to hash -> first file name with that content."""
+    lookup: Dict[str, str] = {}
+    for name, sha in sorted(files.items()):
+        lookup.setdefault(sha, name)
+    return lookup
+
+
+class UploadBatch:
+    """
+    A set of uploads that lands in the data directory all at once.
+
+    `add` only stages files under hidden `.part` names. `commit` moves them
+    into place, setting aside any file they replace, and `rollback` undoes
+    either step, restoring replaced files and their manifest entries.
+    `finish` drops the set-aside files once the batch has been ingested.
+    """
+
+    def __init__(self, store: UploadStore) -> None:
+        self.store = store
+        self.uploads: List[StoredUpload] = []
+        self._staged: Dict[str, Path] = {}
+        self._created: List[StoredUpload] = []
+        self._backups: List[Tuple[Path, Path]] = []
+        self._replaced: Dict[str, str] = {}
+        self._committed = False
+        self._known: Optional[Dict[str, str]] = None
+
+    def add(self, source: BinaryIO, filename: Optional[str]) -> StoredUpload:
+        """Stage one upload; duplicates of stored content are not staged."""
+        name = sanitize_filename(filename)
+        if name in self._staged:
+            raise ValueError(f"{name} appears more than once in this upload")
+
+        partial_path, digest, size = self.store._stage(source, name)
+        upload = StoredUpload(name, digest, size)
+
+        staged_duplicate = next(
+            (other.filename for other in self.uploads
+             if other.sha256 == digest and not other.is_duplicate),
+            None,
+        )
+        # The directory is reconciled once per batch; commit checks again.
+        if self._known is None:
+            with _MANIFEST_LOCK:
+                self._known = _by_hash(self.store._load_manifest())
+        existing = self._known.get(digest)
+        if existing is None:
+            existing = staged_duplicate
+
+        if existing is not None:
+            partial_path.unlink(missing_ok=True)
+            upload.duplicate_of = existing
+            logger.info(
+                "Skipping duplicate upload %s (same content as %s)",
+                name,
+                existing,
+            )
+        else:
+            self._staged[name] = partial_path
+
+        self.uploads.append(upload)
+        return upload
+
+    def commit(self) -> None:
+        """Move staged files into place and record them in the manifest."""
+        data_dir = self.store.data_dir
+        with _MANIFEST_LOCK:
+            # Set first so a failure part-way through can still be undone.
+            self._committed = True
+            files = self.store._load_manifest()
+            known = _by_hash(files)
+            for upload in self.uploads:
+                if upload.is_duplicate:
+                    continue
+                partial_path = self._staged.pop(upload.filename)
+
+                # Another request may have stored the same content meanwhile.
+                existing = known.get(upload.sha256)
+                if existing is not None:
+                    partial_path.unlink(missing_ok=True)
+                    upload.duplicate_of = existing
+                    continue
+
+                # A new revision under an existing name replaces the old
+                # file; keep it aside until the batch is known to be good.
+                target = data_dir / upload.filename
+                if target.exists():
+                    backup = data_dir / f".{uuid.uuid4().hex}{BACKUP_SUFFIX}"
+                    target.replace(backup)
+                    self._backups.append((target, backup))
+                if upload.filename in files:
+                    self._replaced[upload.filename] = files[upload.filename]
+
+                partial_path.replace(target)
+                files[upload.filename] = upload.sha256
+                known[upload.sha256] = upload.filename
+                self._created.append(upload)
+                logger.info("Stored upload %s (%d bytes)", upload.filename, upload.size)
+
+            self.store._write_manifest(files)
+
+    def rollback(self) -> None:
+        """Discard staged files and undo a commit, restoring replaced files."""
+        for partial_path in self._staged.values():
+            partial_path.unlink(missing_ok=True)
+        self._staged.clear()
+
+        if not self._committed:
+            return
+
+        data_dir = self.store.data_dir
+        with _MANIFEST_LOCK:
+            for upload in self._created:
+                (data_dir / upload.filename).unlink(missing_ok=True)
+            for target, backup in self._backups:
+                backup.replace(target)
+
+            files = self.store._load_manifest()
+            for upload in self._created:
+                if files.get(upload.filename) == upload.sha256:
+                    del files[upload.filename]
+            files.update(self._replaced)
+            self.store._write_manifest(files)
+
+        logger.info(
+            "Rolled back %d upload(s), restored %d replaced file(s)",
+            len(self._created),
+            len(self._backups),
+        )
+        self._created.clear()
+        self._backups.clear()
+        self._replaced.clear()
+        self._committed = False
+
+    def finish(self) -> None:
+        """Delete files replaced by this batch; it can no longer be rolled back."""
+        for _target, backup in self._backups:
+            backup.unlink(missing_ok=True)
+        self._backups.clear()
+        self._created.clear()
+        self._replaced.clear()
@@ -5,20 +5,51 @@ Design goals:
 - Always return top-k results if an index exists
 - Avoid over-aggressive distance filtering
 - Prevent hallucinations by returning empty only when index is missing
+- Pick up tuned search parameters persisted next to the index
 """
 
+import json
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import faiss
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 
 from config.settings import get_settings
 from utils.logging import get_logger
+from utils.metrics import timed
 
 logger = get_logger(__name__)
 
+SEARCH_PARAMS_FILE = "search_params.json"
+
+# FAISS index parameters a tuning run may set (IVF / HNSW search breadth).
+INDEX_SEARCH_PARAMETERS = ("nprobe", "efSearch")
+
+
+def load_search_params(index_path: Path) -> Dict[str, Any]:
+    """Read tuned search parameters stored alongside an index, if any."""
+    params_path = index_path / SEARCH_PARAMS_FILE
+    if not params_path.exists():
+        return {}
+    try:
+        return json.loads(params_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable search params %s: %s", params_path, exc)
+        return {}
+
+
+def clear_search_params(index_path: Path) -> None:
+    """Remove tuned parameters; called whenever the index is rebuilt."""
+    params_path = index_path / SEARCH_PARAMS_FILE
+    if params_path.exists():
+        params_path.unlink()
+        logger.info("Removed search params tuned for the previous index: %s", params_path)
+
 
 class VectorRetriever:
     """
@@ -35,6 +66,7 @@ class VectorRetriever:
         *,
         top_k: Optional[int] = None,
         max_distance: Optional[float] = None,
+        embeddings: Optional[Embeddings] = None,
     ) -> None:
         settings = get_settings()
 
@@ -45,7 +77,11 @@ class VectorRetriever:
         # max_distance is OPTIONAL — if None, no filtering is applied
         self.max_distance: Optional[float] = max_distance
 
-        self._embeddings = self._create_embeddings(
+        # Explicit arguments win over tuned parameters from the index dir
+        self._explicit_top_k = top_k is not None
+        self._explicit_max_distance = max_distance is not None
+
+        self._embeddings = embeddings or self._create_embeddings(
             settings.embedding_model_name,
             settings.embedding_batch_size,
         )
@@ -82,6 +118,38 @@ class VectorRetriever:
             self._embeddings,
             allow_dangerous_deserialization=True,
         )
+        self._apply_search_params(load_search_params(self.index_path))
+
+    def _apply_search_params(self, params: Dict[str, Any]) -> None:
+        """Apply tuned parameters unless overridden by constructor args."""
+        if not params or self._store is None:
+            return
+
+        index = self._store.index
+        # Params tuned on another corpus could filter out good results.
+        if params.get("ntotal") not in (None, index.ntotal):
+            logger.warning(
+                "Ignoring search params tuned on %s vectors; index has %d. "
+                "Re-run tuning for the current index",
+                params.get("ntotal"),
+                index.ntotal,
+            )
+            return
+
+        if not self._explicit_top_k and params.get("top_k"):
+            self.top_k = int(params["top_k"])
+        if not self._explicit_max_distance and params.get("max_distance") is not None:
+            self.max_distance = float(params["max_distance"])
+
+        for name in INDEX_SEARCH_PARAMETERS:
+            if name not in params:
+                continue
+            try:
+                faiss.ParameterSpace().set_index_parameter(index, name, params[name])
+            except RuntimeError as exc:
+                logger.warning("Cannot apply %s=%s to index: %s", name, params[name], exc)
+
+        logger.info("Applied tuned search params: %s", params)
 
     def retrieve(self, query: str) -> List[Tuple[Document, float]]:
         """
@@ -101,10 +169,14 @@ class VectorRetriever:
             logger.warning("Vector store not loaded; returning no results.")
             return []
 
-        raw_results = self._store.similarity_search_with_score(
-            query,
-            k=self.top_k,
-        )
+        with timed("query_embedding"):
+            embedding = self._embeddings.embed_query(query)
+
+        with timed("faiss_search"):
+            raw_results = self._store.similarity_search_with_score_by_vector(
+                embedding,
+                k=self.top_k,
+            )
 
         # No results at all
         if not raw_results:
@@ -141,11 +213,26 @@ class VectorRetriever:
         return self._store
 
 
+def document_sources(doc: Document) -> List[str]:
+    """
+    Return every source a chunk stands for.
+
+    Deduplicated chunks carry the sources of the chunks collapsed into them
+    under `duplicate_sources`.
+    """
+    sources: List[str] = [doc.metadata.get("source", "unknown")]
+    for ref in doc.metadata.get("duplicate_sources", []):
+        source = ref.get("source", "unknown")
+        if source not in sources:
+            sources.append(source)
+    return sources
+
+
 def format_citations(docs: Sequence[Document]) -> str:
     """Format citations for grounded answers."""
     citations: List[str] = []
     for doc in docs:
-        source = doc.metadata.get("source", "unknown")
+        source = ", ".join(document_sources(doc))
         chunk_id = doc.metadata.get("chunk_id", "?")
         citations.append(f"[{source} - chunk {chunk_id}]")
     return " ".join(citations)
\ No newline at end of file
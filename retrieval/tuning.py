@@ -0,0 +1,277 @@
+"""
+Recall/latency evaluation and search-parameter tuning for the FAISS index.
+
+Exact neighbours are computed by brute force over the vectors stored in
+the index. Each point of a parameter grid (search breadth via `nprobe` or
+`efSearch`, and a `max_distance` cutoff) is then measured for recall@k and
+per-query latency. The cheapest configuration meeting the target recall
+is written to `search_params.json` in the index directory, where
+`VectorRetriever` picks it up.
+
+k itself is not tuned: it is the depth recall is measured at. Asking an
+IVF-Flat or HNSW index for more results does not recover neighbours the
+search missed, so k only trades recall for prompt size and is left to
+`RAG_RETRIEVER_TOP_K`.
+
+Usage:
+    python -m retrieval.tuning --target-recall 0.95
+    python -m retrieval.tuning --queries-file questions.txt --dry-run
+"""
+
+import argparse
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from config.settings import get_settings
+from retrieval.retriever import SEARCH_PARAMS_FILE
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_BREADTH_GRID = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+DISTANCE_QUANTILES = (0.5, 0.75, 0.9, 0.95, 0.99)
+
+
+@dataclass
+class TrialResult:
+    """Measured quality and cost of one search configuration."""
+
+    top_k: int
+    breadth: Optional[int]
+    max_distance: Optional[float]
+    recall: float
+    mean_results: float
+    p50_ms: float
+    p95_ms: float
+
+
+def search_breadth_parameter(index: faiss.Index) -> Optional[str]:
+    """Name of the index's search-breadth knob, or None for exact indexes."""
+    try:
+        faiss.extract_index_ivf(index)
+        return "nprobe"
+    except RuntimeError:
+        pass
+    if hasattr(faiss.downcast_index(index), "hnsw"):
+        return "efSearch"
+    return None
+
+
+def stored_vectors(index: faiss.Index) -> np.ndarray:
+    """All vectors held by the index, in id order."""
+    try:
+        faiss.extract_index_ivf(index).make_direct_map()
+    except RuntimeError:
+        pass
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def sample_query_vectors(
+    vectors: np.ndarray,
+    num_queries: int,
+    *,
+    noise: float = 0.05,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Perturbed copies of stored vectors, used when no real queries exist.
+
+    Noise is scaled to the mean vector norm so a query is near, but not
+    identical to, its source chunk.
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(num_queries, len(vectors)), replace=False)
+    base = vectors[picks]
+    scale = noise * float(np.linalg.norm(vectors, axis=1).mean()) / np.sqrt(vectors.shape[1])
+    return (base + rng.normal(0, scale, size=base.shape)).astype("float32")
+
+
+def exact_neighbours(vectors: np.ndarray, queries: np.ndarray, k: int):
+    """Brute-force ground truth (distances, ids) using the same L2 metric."""
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    return flat.search(queries, k)
+
+
+def _recall(found: Sequence[int], truth: Sequence[int]) -> float:
+    truth_set = {int(i) for i in truth if i >= 0}
+    if not truth_set:
+        return 1.0
+    return len(truth_set.intersection(int(i) for i in found)) / len(truth_set)
+
+
+def evaluate(
+    index: faiss.Index,
+    queries: np.ndarray,
+    *,
+    top_k: int,
+    breadths: Sequence[Optional[int]],
+    max_distances: Sequence[Optional[float]],
+) -> List[TrialResult]:
+    """Measure recall@k and latency for every grid point."""
+    parameter = search_breadth_parameter(index)
+    _truth_distances, truth_ids = exact_neighbours(stored_vectors(index), queries, top_k)
+    space = faiss.ParameterSpace()
+    results: List[TrialResult] = []
+
+    for breadth in breadths:
+        if parameter and breadth is not None:
+            space.set_index_parameter(index, parameter, breadth)
+
+        latencies: List[float] = []
+        found_ids: List[np.ndarray] = []
+        found_distances: List[np.ndarray] = []
+        for query in queries:
+            start = perf_counter()
+            distances, ids = index.search(query[None, :], top_k)
+            latencies.append(perf_counter() - start)
+            found_ids.append(ids[0])
+            found_distances.append(distances[0])
+
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        for max_distance in max_distances:
+            recalls, counts = [], []
+            for ids, distances, truth in zip(found_ids, found_distances, truth_ids):
+                keep = ids >= 0
+                if max_distance is not None:
+                    keep &= distances <= max_distance
+                recalls.append(_recall(ids[keep], truth))
+                counts.append(int(keep.sum()))
+            results.append(
+                TrialResult(
+                    top_k=top_k,
+                    breadth=breadth if parameter else None,
+                    max_distance=max_distance,
+                    recall=float(np.mean(recalls)),
+                    mean_results=float(np.mean(counts)),
+                    p50_ms=float(p50),
+                    p95_ms=float(p95),
+                )
+            )
+
+    return results
+
+
+def distance_cutoffs(index: faiss.Index, queries: np.ndarray, top_k: int) -> List[Optional[float]]:
+    """Candidate `max_distance` values: none, plus quantiles of k-th neighbour distance."""
+    distances, _ids = exact_neighbours(stored_vectors(index), queries, top_k)
+    kth = distances[:, -1]
+    return [None] + sorted({float(np.quantile(kth, q)) for q in DISTANCE_QUANTILES}, reverse=True)
+
+
+def choose_cheapest(results: Sequence[TrialResult], target_recall: float) -> Optional[TrialResult]:
+    """
+    Pick the cheapest trial meeting the target recall.
+
+    Cost is search breadth first (the dominant, deterministic cost of ANN
+    search), then the number of chunks returned (prompt size for the LLM),
+    then measured median latency.
+    """
+    eligible = [r for r in results if r.recall >= target_recall]
+    if not eligible:
+        return None
+    return min(
+        eligible,
+        key=lambda r: (r.breadth or 0, r.mean_results, r.p50_ms),
+    )
+
+
+def write_search_params(
+    index_path: Path,
+    index: faiss.Index,
+    trial: TrialResult,
+    target_recall: float,
+) -> Path:
+    """Persist the chosen configuration next to the index."""
+    params: Dict[str, Any] = {
+        "max_distance": trial.max_distance,
+        "evaluated_top_k": trial.top_k,
+        "target_recall": target_recall,
+        "measured_recall": trial.recall,
+        "ntotal": index.ntotal,
+        "tuned_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    parameter = search_breadth_parameter(index)
+    if parameter and trial.breadth is not None:
+        params[parameter] = trial.breadth
+
+    params_path = index_path / SEARCH_PARAMS_FILE
+    params_path.write_text(json.dumps(params, indent=2), encoding="utf-8")
+    logger.info("Wrote search params to %s: %s", params_path, params)
+    return params_path
+
+
+def _embed_queries_file(path: Path) -> np.ndarray:
+    from ingestion.indexer import create_embedding_model
+
+    settings = get_settings()
+    queries = [line.strip() for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    model = create_embedding_model(settings.embedding_model_name, settings.embedding_batch_size)
+    return np.asarray(model.embed_documents(queries), dtype="float32")
+
+
+def main(argv: Optional[list] = None) -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--index-path", type=Path, default=settings.vector_store_path)
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=settings.retriever_top_k,
+        help="k at which recall is measured (not tuned)",
+    )
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--queries", type=int, default=200, help="Sampled queries when no file is given")
+    parser.add_argument("--queries-file", type=Path, help="Real questions, one per line (embedded with the configured model)")
+    parser.add_argument("--breadths", type=int, nargs="+", default=list(DEFAULT_BREADTH_GRID))
+    parser.add_argument("--no-distance-cutoff", action="store_true", help="Do not tune max_distance even with --queries-file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing search params")
+    args = parser.parse_args(argv)
+
+    index = faiss.read_index((args.index_path / "index.faiss").as_posix())
+    if args.queries_file:
+        queries = _embed_queries_file(args.queries_file)
+    else:
+        queries = sample_query_vectors(stored_vectors(index), args.queries, seed=args.seed)
+
+    parameter = search_breadth_parameter(index)
+    breadths: List[Optional[int]] = list(args.breadths) if parameter else [None]
+    # Distances of perturbed stored vectors say nothing about how far real
+    # questions land, so a cutoff is only tuned against real queries.
+    if args.queries_file and not args.no_distance_cutoff:
+        cutoffs = distance_cutoffs(index, queries, args.top_k)
+    else:
+        cutoffs = [None]
+
+    results = evaluate(
+        index,
+        queries,
+        top_k=args.top_k,
+        breadths=breadths,
+        max_distances=cutoffs,
+    )
+    for result in results:
+        print(json.dumps(asdict(result)))
+
+    best = choose_cheapest(results, args.target_recall)
+    if best is None:
+        raise SystemExit(
+            f"No configuration reached recall {args.target_recall:.2f}; "
+            "widen the grid or lower the target."
+        )
+
+    print(f"Selected ({parameter or 'exact index'}): {json.dumps(asdict(best))}")
+    if not args.dry_run:
+        write_search_params(args.index_path, index, best, args.target_recall)
+
+
+if __name__ == "__main__":
+    main()
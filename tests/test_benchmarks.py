@@ -0,0 +1,26 @@
+"""Smoke test for the component benchmark suite."""
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from benchmarks.components import run_benchmarks
+from benchmarks.reporting import percentile
+
+
+def test_percentile_interpolates():
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+    assert percentile([], 0.9) == 0.0
+
+
+def test_run_benchmarks_offline(tmp_path):
+    results = run_benchmarks(
+        tmp_path,
+        DeterministicFakeEmbedding(size=16),
+        num_docs=3,
+        words_per_doc=300,
+        num_queries=5,
+    )
+
+    assert results["load_documents"]["documents"] == 3
+    assert results["embedding"]["dimension"] == 16
+    assert results["index_size"]["disk_bytes"] > 0
+    assert results["retrieve"]["count"] == 5
@@ -0,0 +1,115 @@
+"""Tests for resumable bulk ingestion."""
+
+from pathlib import Path
+
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from ingestion.bulk import default_checkpoint_dir, run_bulk_ingest
+from retrieval.retriever import SEARCH_PARAMS_FILE
+
+
+def write_corpus(directory, count=6):
+    directory.mkdir()
+    for i in range(count):
+        text = "\n\n".join(f"Document {i} paragraph {p} about topic {i * 7 + p}." for p in range(5))
+        (directory / f"doc_{i}.txt").write_text(text, encoding="utf-8")
+
+
+def ingest(data_dir, index_path, embeddings, **kwargs):
+    options = dict(
+        model_name="fake",
+        chunk_size=60,
+        chunk_overlap=0,
+        batch_files=2,
+        workers=1,
+    )
+    options.update(kwargs)
+    return run_bulk_ingest(data_dir, index_path, embeddings, **options)
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path):
+    data_dir, index_path = tmp_path / "data", tmp_path / "faiss_index"
+    write_corpus(data_dir)
+    embeddings = DeterministicFakeEmbedding(size=8)
+
+    partial = ingest(data_dir, index_path, embeddings, max_batches=1)
+    assert not partial.completed
+    assert partial.files_done == 2
+    assert partial.index_path is None
+    assert (default_checkpoint_dir(index_path) / "shards" / "batch_00001" / "index.faiss").exists()
+
+    index_path.mkdir()
+    (index_path / SEARCH_PARAMS_FILE).write_text("{}", encoding="utf-8")
+
+    resumed = ingest(data_dir, index_path, embeddings, workers=2)
+    assert resumed.completed
+    assert resumed.batches_run == 2
+    assert resumed.files_done == 6
+    assert not default_checkpoint_dir(index_path).exists()
+    assert not (index_path / SEARCH_PARAMS_FILE).exists()
+
+    store = FAISS.load_local(index_path.as_posix(), embeddings, allow_dangerous_deserialization=True)
+    docs = list(store.docstore._dict.values())
+    assert len(docs) == resumed.chunks_indexed
+    assert len({doc.metadata["chunk_id"] for doc in docs}) == len(docs)
+    assert {Path(doc.metadata["source"]).name for doc in docs} == {f"doc_{i}.txt" for i in range(6)}
+
+
+def test_batches_append_shards_without_rewriting_earlier_ones(tmp_path):
+    data_dir, index_path = tmp_path / "data", tmp_path / "faiss_index"
+    write_corpus(data_dir)
+    embeddings = DeterministicFakeEmbedding(size=8)
+    shards = default_checkpoint_dir(index_path) / "shards"
+
+    ingest(data_dir, index_path, embeddings, max_batches=1)
+    first = (shards / "batch_00001" / "index.faiss").stat().st_mtime_ns
+    # Left behind by a batch that died before the manifest listed it.
+    (shards / "batch_00009").mkdir()
+
+    ingest(data_dir, index_path, embeddings, max_batches=1)
+    assert (shards / "batch_00001" / "index.faiss").stat().st_mtime_ns == first
+    assert sorted(path.name for path in shards.iterdir()) == ["batch_00001", "batch_00002"]
+
+    result = ingest(data_dir, index_path, embeddings)
+    assert result.completed
+    store = FAISS.load_local(index_path.as_posix(), embeddings, allow_dangerous_deserialization=True)
+    assert store.index.ntotal == result.chunks_indexed
+
+
+def test_duplicates_across_batches_and_runs_are_merged(tmp_path):
+    data_dir, index_path = tmp_path / "data", tmp_path / "faiss_index"
+    write_corpus(data_dir)
+    shared = "Shared disclaimer repeated verbatim in several reports."
+    for name in ("doc_0.txt", "doc_3.txt", "doc_5.txt"):
+        path = data_dir / name
+        path.write_text(path.read_text(encoding="utf-8") + "\n\n" + shared, encoding="utf-8")
+    embeddings = DeterministicFakeEmbedding(size=8)
+
+    ingest(data_dir, index_path, embeddings, max_batches=1)
+    result = ingest(data_dir, index_path, embeddings)
+    assert result.completed
+
+    store = FAISS.load_local(index_path.as_posix(), embeddings, allow_dangerous_deserialization=True)
+    matches = [doc for doc in store.docstore._dict.values() if doc.page_content == shared]
+    assert len(matches) == 1
+    assert Path(matches[0].metadata["source"]).name == "doc_0.txt"
+    assert sorted(Path(ref["source"]).name for ref in matches[0].metadata["duplicate_sources"]) == [
+        "doc_3.txt",
+        "doc_5.txt",
+    ]
+    assert store.index.ntotal == result.chunks_indexed
+
+
+def test_checkpoint_with_other_settings_is_refused(tmp_path):
+    data_dir, index_path = tmp_path / "data", tmp_path / "faiss_index"
+    write_corpus(data_dir)
+    embeddings = DeterministicFakeEmbedding(size=8)
+    ingest(data_dir, index_path, embeddings, max_batches=1)
+
+    with pytest.raises(ValueError, match="restart"):
+        ingest(data_dir, index_path, embeddings, chunk_size=100)
+
+    restarted = ingest(data_dir, index_path, embeddings, chunk_size=100, restart=True)
+    assert restarted.completed
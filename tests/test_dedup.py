@@ -0,0 +1,68 @@
+"""Tests for duplicate and near-duplicate chunk elimination."""
+
+from langchain_core.documents import Document
+
+from ingestion.dedup import deduplicate_chunks
+from retrieval.retriever import format_citations
+
+BOILERPLATE = (
+    "This document is provided for informational purposes only and does not "
+    "constitute legal advice. All rights reserved by the publisher and its "
+    "affiliates. Reproduction without written permission is prohibited. "
+    "The information contained herein was believed accurate at the time of "
+    "publication, but no warranty, express or implied, is given as to its "
+    "completeness. Readers should consult a qualified professional before "
+    "acting on any statement in this report. Trademarks mentioned remain the "
+    "property of their respective owners and are used for identification only."
+)
+
+
+def make_chunk(text, source, chunk_id):
+    return Document(page_content=text, metadata={"source": source, "chunk_id": chunk_id})
+
+
+def test_exact_duplicates_collapse_and_keep_sources():
+    chunks = [
+        make_chunk(BOILERPLATE, "a.pdf", 0),
+        make_chunk("Unrelated findings about soil moisture.", "a.pdf", 1),
+        make_chunk("  " + BOILERPLATE.upper() + "\n", "b.pdf", 2),
+    ]
+    kept, stats = deduplicate_chunks(chunks)
+
+    assert [doc.metadata["chunk_id"] for doc in kept] == [0, 1]
+    assert kept[0].metadata["duplicate_sources"] == [{"source": "b.pdf", "chunk_id": 2}]
+    assert stats.exact_duplicates == 1
+    assert stats.near_duplicates == 0
+    assert stats.removed == 1
+
+
+def test_near_duplicates_collapse():
+    revised = BOILERPLATE.replace("the publisher", "the original publisher")
+    chunks = [
+        make_chunk(BOILERPLATE, "v1.pdf", 0),
+        make_chunk(revised, "v2.pdf", 1),
+    ]
+    kept, stats = deduplicate_chunks(chunks, similarity_threshold=0.8)
+
+    assert len(kept) == 1
+    assert stats.near_duplicates == 1
+    assert format_citations(kept) == "[v1.pdf, v2.pdf - chunk 0]"
+
+
+def test_distinct_chunks_are_kept():
+    chunks = [
+        make_chunk("Photosynthesis converts light energy into chemical energy.", "a.pdf", 0),
+        make_chunk("The treaty was signed after three years of negotiation.", "b.pdf", 1),
+    ]
+    kept, stats = deduplicate_chunks(chunks)
+
+    assert len(kept) == 2
+    assert stats.reduction_ratio == 0.0
+
+
+def test_threshold_one_disables_near_matching():
+    revised = BOILERPLATE.replace("the publisher", "the original publisher")
+    chunks = [make_chunk(BOILERPLATE, "v1.pdf", 0), make_chunk(revised, "v2.pdf", 1)]
+    kept, _stats = deduplicate_chunks(chunks, similarity_threshold=1.0)
+
+    assert len(kept) == 2
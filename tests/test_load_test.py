@@ -0,0 +1,49 @@
+"""Tests for the load-testing harness and fake Ollama server."""
+
+import json
+
+import pytest
+import requests
+
+from benchmarks.fake_ollama import FakeOllamaServer
+from benchmarks.load_test import SMALL_TALK, QueryMix, load_queries_file, main
+from generation.llm_client import OllamaClient
+
+
+def test_fake_ollama_serves_client_and_stream():
+    server = FakeOllamaServer(ttft=0.0, tokens_per_second=1000, max_tokens=5).start()
+    try:
+        client = OllamaClient(server.url, "llama3", max_tokens=3)
+        assert client.generate("question") == "tok0 tok1 tok2"
+
+        response = requests.post(
+            f"{server.url}/api/generate",
+            json={"model": "llama3", "prompt": "question", "stream": True},
+            stream=True,
+            timeout=10,
+        )
+        lines = [json.loads(line) for line in response.iter_lines() if line]
+        assert [line["done"] for line in lines] == [False] * 5 + [True]
+        assert lines[-1]["eval_count"] == 5
+    finally:
+        server.stop()
+
+
+def test_query_mix_is_deterministic_and_mixed():
+    documents = [f"question {i}?" for i in range(50)]
+    mix_a, mix_b = QueryMix(documents, seed=3), QueryMix(documents, seed=3)
+    sample_a = [mix_a.next() for _ in range(200)]
+    sample_b = [mix_b.next() for _ in range(200)]
+
+    assert sample_a == sample_b
+    assert any(query in SMALL_TALK for query in sample_a)
+    assert any(query in documents for query in sample_a)
+
+
+def test_target_url_requires_queries_file(tmp_path):
+    with pytest.raises(SystemExit):
+        main(["--target-url", "http://127.0.0.1:9"])
+
+    questions = tmp_path / "questions.txt"
+    questions.write_text("# deployment questions\nWhat is the refund policy?\n\nWho signs off?\n", encoding="utf-8")
+    assert load_queries_file(questions) == ["What is the refund policy?", "Who signs off?"]
@@ -0,0 +1,73 @@
+"""Tests for stage timing and Prometheus rendering."""
+
+import pytest
+
+from utils.metrics import (
+    REGISTRY,
+    STAGE_FAILURES,
+    STAGE_SECONDS,
+    MetricsRegistry,
+    collect_timings,
+    record_timing,
+    timed,
+)
+
+
+@pytest.fixture
+def metrics_enabled():
+    previous = REGISTRY.enabled
+    REGISTRY.enabled = True
+    yield
+    REGISTRY.enabled = previous
+
+
+def test_timed_records_histogram_and_request_timings(metrics_enabled):
+    before = STAGE_SECONDS.count(stage="test_stage")
+
+    with collect_timings() as timings:
+        with timed("test_stage"):
+            pass
+        record_timing("llm_tokens_per_second", 42.0)
+
+    assert STAGE_SECONDS.count(stage="test_stage") == before + 1
+    assert set(timings) == {"test_stage", "llm_tokens_per_second"}
+
+
+def test_timed_counts_failures(metrics_enabled):
+    before = STAGE_FAILURES.value(stage="failing_stage")
+    with pytest.raises(RuntimeError):
+        with timed("failing_stage"):
+            raise RuntimeError("boom")
+
+    assert STAGE_FAILURES.value(stage="failing_stage") == before + 1
+
+
+def test_disabled_metrics_record_nothing():
+    previous = REGISTRY.enabled
+    REGISTRY.enabled = False
+    try:
+        with collect_timings(enabled=False) as timings:
+            with timed("disabled_stage"):
+                pass
+    finally:
+        REGISTRY.enabled = previous
+
+    assert timings is None
+    assert STAGE_SECONDS.count(stage="disabled_stage") == 0
+
+
+def test_render_prometheus_text():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("demo_seconds", "Demo.", ("stage",), buckets=(0.1, 1.0))
+    counter = registry.counter("demo_total", "Demo count.")
+    histogram.observe(0.5, stage="a")
+    counter.inc(3)
+
+    text = registry.render()
+
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="a",le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{stage="a",le="1.0"} 1' in text
+    assert 'demo_seconds_bucket{stage="a",le="+Inf"} 1' in text
+    assert 'demo_seconds_count{stage="a"} 1.0' in text
+    assert "demo_total 3.0" in text
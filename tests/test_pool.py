@@ -0,0 +1,184 @@
+"""Tests for Ollama endpoint pooling against local fake servers."""
+
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from generation.llm_client import OllamaClient, OllamaUnavailableError
+from generation.pool import OllamaPool
+
+
+class FakeOllama:
+    """Minimal Ollama stand-in serving /api/generate, /api/ps and /api/tags."""
+
+    def __init__(self, reply="ok", status=200):
+        self.reply = reply
+        self.status = status
+        self.loaded = False
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                models = [{"name": "llama3:latest"}] if fake.loaded or self.path == "/api/tags" else []
+                self._send(200, {"models": models})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                fake.requests.append(payload)
+                fake.loaded = True
+                if fake.status != 200:
+                    self._send(fake.status, {"error": "busy"})
+                else:
+                    self._send(200, {"response": fake.reply if payload["prompt"] else ""})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def make(**kwargs):
+        server = FakeOllama(**kwargs)
+        started.append(server)
+        return server
+
+    yield make
+    for server in started:
+        server.close()
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def make_pool(*urls):
+    clients = [OllamaClient(url, "llama3", keep_alive="5m") for url in urls]
+    return OllamaPool(clients, warm_up=True)
+
+
+def test_fails_over_to_reachable_endpoint(servers):
+    live = servers(reply="from live")
+    pool = make_pool(closed_port_url(), live.url)
+
+    assert pool.generate("question") == "from live"
+    assert pool.generate("question") == "from live"
+    healthy = [backend["healthy"] for backend in pool.stats()]
+    assert healthy == [False, True]
+    assert live.requests[0]["keep_alive"] == "5m"
+
+
+def test_fails_over_on_overloaded_endpoint(servers):
+    busy = servers(status=503)
+    live = servers(reply="from live")
+    pool = make_pool(busy.url, live.url)
+
+    assert pool.generate("question") == "from live"
+
+
+def test_all_endpoints_down_raises():
+    pool = make_pool(closed_port_url(), closed_port_url())
+    with pytest.raises(OllamaUnavailableError):
+        pool.generate("question")
+
+
+def test_routes_to_least_outstanding(servers):
+    first, second = servers(reply="first"), servers(reply="second")
+    pool = make_pool(first.url, second.url)
+    pool.backends[0].outstanding = 3
+
+    assert pool.generate("question") == "second"
+
+
+def test_health_check_warms_up_and_recovers(servers):
+    live = servers()
+    pool = make_pool(live.url)
+    pool.backends[0].healthy = False
+
+    pool.check_health()
+
+    assert pool.stats()[0]["healthy"] is True
+    assert pool.stats()[0]["model_loaded"] is True
+    assert live.requests == [{"model": "llama3", "prompt": "", "stream": False, "keep_alive": "5m"}]
+
+    pool.check_health()
+    assert len(live.requests) == 1
+
+
+def test_per_backend_limit_holds_when_an_endpoint_is_down():
+    in_flight, peak = [0], [0]
+    release = threading.Event()
+    lock = threading.Lock()
+
+    class SlowClient:
+        base_url = "http://live"
+
+        def generate(self, prompt):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            release.wait(timeout=5)
+            with lock:
+                in_flight[0] -= 1
+            return "ok"
+
+    pool = OllamaPool(
+        [OllamaClient(closed_port_url(), "llama3"), SlowClient()],
+        max_per_backend=2,
+    )
+    pool.backends[0].healthy = False
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.generate("q")))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    while pool.stats()[1]["outstanding"] < 2:
+        threading.Event().wait(0.005)
+    threading.Event().wait(0.05)
+
+    assert peak[0] == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["ok"] * 4
+    assert peak[0] == 2
+
+
+def test_app_lifespan_starts_and_stops_health_checks(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main as api_main
+
+    pool = make_pool(closed_port_url())
+    monkeypatch.setattr(api_main, "get_llm_pool", lambda: pool.start() or pool)
+
+    with TestClient(api_main.app):
+        assert pool._thread is not None and pool._thread.is_alive()
+    assert pool._thread is None
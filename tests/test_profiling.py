@@ -0,0 +1,77 @@
+"""Tests for per-request profiling."""
+
+import pytest
+from fastapi import HTTPException
+
+from utils.profiling import RequestProfiler
+
+
+def busy_work():
+    return sum(i * i for i in range(10000))
+
+
+def test_profile_written_and_pruned(tmp_path):
+    profiler = RequestProfiler(tmp_path, max_profiles=2)
+    ids = []
+    for _ in range(3):
+        with profiler.profile("query") as profile_id:
+            busy_work()
+        ids.append(profile_id)
+
+    assert sorted(path.name for path in tmp_path.glob("*.prof")) == sorted(
+        f"{profile_id}.prof" for profile_id in ids[1:]
+    )
+    assert "busy_work" in (tmp_path / f"{ids[-1]}.txt").read_text(encoding="utf-8")
+
+
+def test_concurrent_profile_is_skipped(tmp_path):
+    profiler = RequestProfiler(tmp_path)
+    with profiler.profile("ingest") as outer:
+        with profiler.profile("query") as inner:
+            busy_work()
+
+    assert outer is not None
+    assert inner is None
+    assert len(list(tmp_path.glob("*.prof"))) == 1
+
+
+@pytest.fixture
+def profiled_api(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main as api_main
+
+    monkeypatch.setattr(api_main.get_settings(), "profiling_enabled", True)
+    monkeypatch.setattr(api_main, "get_profiler", lambda: RequestProfiler(tmp_path))
+    return api_main, TestClient(api_main.app, raise_server_exceptions=False)
+
+
+def test_profile_id_returned_on_success(tmp_path, profiled_api, monkeypatch):
+    api_main, client = profiled_api
+    monkeypatch.setattr(api_main, "_answer_query", lambda payload: {"answer": "ok"})
+
+    response = client.post("/query?profile=true", json={"query": "q"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert response.json()["profile_id"] == profile_id
+    assert (tmp_path / f"{profile_id}.prof").exists()
+
+    plain = client.post("/query", json={"query": "q"})
+    assert "X-Profile-Id" not in plain.headers
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [(HTTPException(status_code=404, detail="none"), 404), (RuntimeError("boom"), 500)],
+)
+def test_profile_id_returned_on_error(tmp_path, profiled_api, monkeypatch, error, status):
+    api_main, client = profiled_api
+
+    def fail(payload):
+        raise error
+
+    monkeypatch.setattr(api_main, "_answer_query", fail)
+    response = client.post("/query", json={"query": "q"}, headers={"X-Profile": "1"})
+
+    assert response.status_code == status
+    assert (tmp_path / f"{response.headers['X-Profile-Id']}.prof").exists()
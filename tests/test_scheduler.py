@@ -0,0 +1,117 @@
+"""Tests for LLM generation scheduling."""
+
+import threading
+import time
+
+import pytest
+
+from generation.scheduler import GenerationScheduler, QueueFullError, QueueTimeoutError
+
+
+class BlockingClient:
+    """Fake LLM client that blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        self.release.wait(timeout=5)
+        return f"answer to {prompt}"
+
+
+def start(scheduler, prompt, results):
+    def run():
+        try:
+            results.append(scheduler.generate(prompt))
+        except Exception as exc:  # noqa: BLE001
+            results.append(exc)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met")
+        time.sleep(0.005)
+
+
+def test_identical_prompts_are_coalesced():
+    client = BlockingClient()
+    scheduler = GenerationScheduler(client, max_concurrency=1, max_queue=2)
+    results = []
+
+    threads = [start(scheduler, "same", results) for _ in range(3)]
+    wait_for(lambda: scheduler.stats()["coalesced"] == 2)
+    client.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 1
+    assert results == ["answer to same"] * 3
+
+
+def test_full_queue_rejects_with_retry_after():
+    client = BlockingClient()
+    scheduler = GenerationScheduler(client, max_concurrency=1, max_queue=1, retry_after=7)
+    results = []
+
+    threads = [start(scheduler, "first", results), start(scheduler, "second", results)]
+    wait_for(lambda: scheduler.stats()["waiting"] == 1)
+
+    with pytest.raises(QueueFullError) as excinfo:
+        scheduler.generate("third")
+    assert excinfo.value.retry_after == 7
+
+    client.release.set()
+    for thread in threads:
+        thread.join()
+    stats = scheduler.stats()
+    assert stats["completed"] == 2
+    assert stats["rejected"] == 1
+    assert stats["queue_time"]["samples"] == 2
+
+
+def test_queue_timeout():
+    client = BlockingClient()
+    scheduler = GenerationScheduler(client, max_concurrency=1, queue_timeout=0.05)
+    results = []
+
+    thread = start(scheduler, "slow", results)
+    wait_for(lambda: scheduler.stats()["active"] == 1)
+
+    with pytest.raises(QueueTimeoutError):
+        scheduler.generate("other")
+
+    client.release.set()
+    thread.join()
+    assert scheduler.stats()["timed_out"] == 1
+
+
+def test_coalesced_requests_count_against_queue_and_time_out():
+    client = BlockingClient()
+    scheduler = GenerationScheduler(client, max_concurrency=1, max_queue=1, queue_timeout=0.1)
+    results = []
+
+    leader = start(scheduler, "popular", results)
+    wait_for(lambda: scheduler.stats()["active"] == 1)
+    follower = start(scheduler, "popular", results)
+    wait_for(lambda: scheduler.stats()["coalesced_waiting"] == 1)
+
+    with pytest.raises(QueueFullError):
+        scheduler.generate("popular")
+
+    follower.join()
+    assert isinstance(results[0], QueueTimeoutError)
+    assert scheduler.stats()["coalesced_waiting"] == 0
+
+    client.release.set()
+    leader.join()
+    assert results[1] == "answer to popular"
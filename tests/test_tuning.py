@@ -0,0 +1,90 @@
+"""Tests for ANN evaluation and tuned search parameters."""
+
+import json
+
+import faiss
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from retrieval.retriever import SEARCH_PARAMS_FILE, VectorRetriever, clear_search_params
+from retrieval.tuning import (
+    TrialResult,
+    choose_cheapest,
+    evaluate,
+    sample_query_vectors,
+    search_breadth_parameter,
+    stored_vectors,
+    write_search_params,
+)
+
+
+def make_ivf_index(dim=16, count=2000, nlist=32):
+    vectors = np.random.default_rng(0).random((count, dim), dtype="float32")
+    index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, nlist)
+    index.train(vectors)
+    index.add(vectors)
+    return index
+
+
+def test_breadth_parameter_detection():
+    assert search_breadth_parameter(faiss.IndexFlatL2(8)) is None
+    assert search_breadth_parameter(make_ivf_index()) == "nprobe"
+    assert search_breadth_parameter(faiss.IndexHNSWFlat(8, 16)) == "efSearch"
+
+
+def test_recall_grows_with_nprobe_and_cheapest_is_chosen():
+    index = make_ivf_index()
+    queries = sample_query_vectors(stored_vectors(index), 50)
+    results = evaluate(index, queries, top_k=5, breadths=[1, 32], max_distances=[None])
+
+    narrow, full = results
+    assert narrow.recall < full.recall == 1.0
+    assert choose_cheapest(results, 0.99) == full
+    assert choose_cheapest(results, 0.0) == narrow
+
+
+def test_choose_cheapest_prefers_fewer_results():
+    loose = TrialResult(4, None, None, 1.0, 4.0, 0.1, 0.2)
+    tight = TrialResult(4, None, 1.5, 0.96, 3.1, 0.1, 0.2)
+    assert choose_cheapest([loose, tight], 0.95) == tight
+    assert choose_cheapest([loose, tight], 0.99) == loose
+
+
+def test_retriever_picks_up_search_params(tmp_path):
+    embeddings = DeterministicFakeEmbedding(size=8)
+    texts = [f"chunk number {i}" for i in range(10)]
+    FAISS.from_texts(texts, embeddings).save_local(tmp_path.as_posix())
+    (tmp_path / SEARCH_PARAMS_FILE).write_text(json.dumps({"top_k": 2}), encoding="utf-8")
+
+    tuned = VectorRetriever(tmp_path, embeddings=embeddings)
+    explicit = VectorRetriever(tmp_path, top_k=3, embeddings=embeddings)
+
+    assert len(tuned.retrieve("chunk number 1")) == 2
+    assert len(explicit.retrieve("chunk number 1")) == 3
+
+
+def test_stale_search_params_are_ignored(tmp_path):
+    embeddings = DeterministicFakeEmbedding(size=8)
+    texts = [f"chunk number {i}" for i in range(10)]
+    FAISS.from_texts(texts, embeddings).save_local(tmp_path.as_posix())
+    (tmp_path / SEARCH_PARAMS_FILE).write_text(
+        json.dumps({"top_k": 2, "max_distance": 0.0, "ntotal": 500}), encoding="utf-8"
+    )
+
+    retriever = VectorRetriever(tmp_path, top_k=3, embeddings=embeddings)
+    assert len(retriever.retrieve("chunk number 1")) == 3
+    assert retriever.max_distance is None
+
+    clear_search_params(tmp_path)
+    assert not (tmp_path / SEARCH_PARAMS_FILE).exists()
+
+
+def test_written_params_leave_top_k_untuned(tmp_path):
+    index = make_ivf_index()
+    trial = TrialResult(5, 8, None, 0.97, 5.0, 0.1, 0.2)
+    params = json.loads(write_search_params(tmp_path, index, trial, 0.95).read_text(encoding="utf-8"))
+
+    assert "top_k" not in params
+    assert params["nprobe"] == 8
+    assert params["evaluated_top_k"] == 5
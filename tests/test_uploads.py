@@ -0,0 +1,229 @@
+"""Tests for streaming upload storage and deduplication."""
+
+import io
+
+import pytest
+
+from ingestion.uploads import UploadStore, UploadTooLargeError
+
+
+def make_store(tmp_path, max_file_bytes=1024):
+    return UploadStore(tmp_path, max_file_bytes=max_file_bytes, chunk_size=16)
+
+
+def test_save_writes_file_and_hash(tmp_path):
+    store = make_store(tmp_path)
+    upload = store.save(io.BytesIO(b"%PDF-1.4 content"), "report.pdf")
+
+    assert not upload.is_duplicate
+    assert upload.size == 16
+    assert (tmp_path / "report.pdf").read_bytes() == b"%PDF-1.4 content"
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_duplicate_content_is_skipped(tmp_path):
+    store = make_store(tmp_path)
+    store.save(io.BytesIO(b"same bytes"), "a.pdf")
+    upload = store.save(io.BytesIO(b"same bytes"), "b.pdf")
+
+    assert upload.duplicate_of == "a.pdf"
+    assert not (tmp_path / "b.pdf").exists()
+
+
+def test_existing_files_are_detected_as_duplicates(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "old.pdf").write_bytes(b"already here")
+    upload = make_store(tmp_path).save(io.BytesIO(b"already here"), "new.pdf")
+
+    assert upload.duplicate_of == "nested/old.pdf"
+
+
+def test_oversized_upload_is_rejected(tmp_path):
+    store = make_store(tmp_path, max_file_bytes=10)
+    with pytest.raises(UploadTooLargeError):
+        store.save(io.BytesIO(b"x" * 11), "big.pdf")
+
+    assert not (tmp_path / "big.pdf").exists()
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_filename_directories_are_stripped(tmp_path):
+    upload = make_store(tmp_path).save(io.BytesIO(b"data"), "../../evil.pdf")
+
+    assert upload.filename == "evil.pdf"
+    assert (tmp_path / "evil.pdf").exists()
+
+
+def test_rollback_removes_new_file_and_manifest_entry(tmp_path):
+    store = make_store(tmp_path)
+    batch = store.batch()
+    batch.add(io.BytesIO(b"data"), "doc.pdf")
+    batch.commit()
+    batch.rollback()
+
+    assert not (tmp_path / "doc.pdf").exists()
+    assert not store.save(io.BytesIO(b"data"), "doc.pdf").is_duplicate
+
+
+def test_rollback_restores_replaced_file(tmp_path):
+    store = make_store(tmp_path)
+    store.save(io.BytesIO(b"version one"), "report.pdf")
+
+    batch = store.batch()
+    batch.add(io.BytesIO(b"version two"), "report.pdf")
+    batch.commit()
+    assert (tmp_path / "report.pdf").read_bytes() == b"version two"
+    batch.rollback()
+
+    assert (tmp_path / "report.pdf").read_bytes() == b"version one"
+    assert store.save(io.BytesIO(b"version one"), "copy.pdf").duplicate_of == "report.pdf"
+    assert not list(tmp_path.glob(".*.bak"))
+
+
+def test_batch_stages_until_commit(tmp_path):
+    store = make_store(tmp_path)
+    batch = store.batch()
+    batch.add(io.BytesIO(b"first"), "a.pdf")
+    duplicate = batch.add(io.BytesIO(b"first"), "b.pdf")
+    assert duplicate.duplicate_of == "a.pdf"
+    assert not (tmp_path / "a.pdf").exists()
+
+    batch.rollback()
+    assert not list(tmp_path.iterdir())
+
+
+def test_data_directory_is_hashed_once(tmp_path, monkeypatch):
+    import ingestion.uploads as uploads
+
+    for i in range(50):
+        (tmp_path / f"existing_{i}.pdf").write_bytes(f"existing {i}".encode())
+    (tmp_path / "copy.pdf").write_bytes(b"existing 0")
+    calls = []
+    real_hash_file = uploads.hash_file
+    monkeypatch.setattr(uploads, "hash_file", lambda *a: calls.append(a) or real_hash_file(*a))
+
+    store = make_store(tmp_path)
+    batch = store.batch()
+    for i in range(3):
+        batch.add(io.BytesIO(f"new {i}".encode()), f"new_{i}.pdf")
+    batch.rollback()
+    upload = store.save(io.BytesIO(b"existing 7"), "again.pdf")
+
+    assert len(calls) == 51
+    assert upload.duplicate_of == "existing_7.pdf"
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api.main as api_main
+
+    store = make_store(tmp_path)
+    monkeypatch.setattr(api_main, "get_upload_store", lambda: store)
+    monkeypatch.setattr(api_main, "build_and_persist_index", lambda data_dir: tmp_path / "index")
+    return api_main, store, TestClient(api_main.app, raise_server_exceptions=False)
+
+
+def test_rejected_batch_restores_replaced_file(tmp_path, api):
+    _api_main, store, client = api
+    store.save(io.BytesIO(b"version one"), "report.pdf")
+
+    response = client.post(
+        "/ingest/uploads",
+        files=[
+            ("files", ("report.pdf", b"version two", "application/pdf")),
+            ("files", ("big.pdf", b"x" * 2048, "application/pdf")),
+        ],
+    )
+
+    assert response.status_code == 413
+    assert (tmp_path / "report.pdf").read_bytes() == b"version one"
+    assert not (tmp_path / "big.pdf").exists()
+    assert store.save(io.BytesIO(b"version one"), "copy.pdf").duplicate_of == "report.pdf"
+
+
+def test_failed_ingestion_restores_replaced_file(tmp_path, api, monkeypatch):
+    api_main, store, client = api
+    store.save(io.BytesIO(b"version one"), "report.pdf")
+
+    def fail(data_dir):
+        raise RuntimeError("embedding failed")
+
+    monkeypatch.setattr(api_main, "build_and_persist_index", fail)
+    response = client.post(
+        "/ingest/uploads",
+        files=[("files", ("report.pdf", b"version two", "application/pdf"))],
+    )
+
+    assert response.status_code == 500
+    assert (tmp_path / "report.pdf").read_bytes() == b"version one"
+
+
+def test_successful_batch_replaces_file(tmp_path, api):
+    _api_main, store, client = api
+    store.save(io.BytesIO(b"version one"), "report.pdf")
+
+    response = client.post(
+        "/ingest/uploads",
+        files=[("files", ("report.pdf", b"version two", "application/pdf"))],
+    )
+
+    assert response.status_code == 200
+    assert response.json()["uploaded_files"] == ["report.pdf"]
+    assert (tmp_path / "report.pdf").read_bytes() == b"version two"
+    assert not list(tmp_path.glob(".*.bak"))
+
+
+def test_oversized_request_rejected_from_content_length(api, monkeypatch):
+    api_main, _store, client = api
+    settings = api_main.get_settings()
+    monkeypatch.setattr(settings, "upload_max_files", 1)
+    monkeypatch.setattr(settings, "upload_max_file_bytes", 1024)
+
+    response = client.post(
+        "/ingest/uploads",
+        files=[("files", ("big.pdf", b"x" * 64 * 1024, "application/pdf"))],
+    )
+
+    assert response.status_code == 413
+    assert "byte limit" in response.json()["detail"]
+
+
+def test_index_builds_are_serialized(tmp_path, api, monkeypatch):
+    import threading
+    import time
+
+    api_main, store, _client = api
+    active, overlap = [], []
+
+    def build(data_dir):
+        active.append(1)
+        overlap.append(len(active))
+        time.sleep(0.05)
+        active.pop()
+        if threading.current_thread().name == "batch-a":
+            raise RuntimeError("embedding failed")
+        return tmp_path / "index"
+
+    monkeypatch.setattr(api_main, "build_and_persist_index", build)
+    batches = {}
+    for name in ("a", "b"):
+        batches[name] = store.batch()
+        batches[name].add(io.BytesIO(f"content {name}".encode()), f"{name}.pdf")
+
+    def run(name):
+        try:
+            api_main._commit_and_index(batches[name], tmp_path)
+        except RuntimeError:
+            pass
+
+    threads = [threading.Thread(target=run, args=(n,), name=f"batch-{n}") for n in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(overlap) == 1
+    assert not (tmp_path / "a.pdf").exists()
+    assert (tmp_path / "b.pdf").read_bytes() == b"content b"
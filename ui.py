@@ -16,17 +16,26 @@ uploaded_files = st.file_uploader(
 
 if st.button("Ingest Documents"):
     if uploaded_files:
-        for file in uploaded_files:
-            files = {"file": (file.name, file, "application/pdf")}
-            response = requests.post(
-                f"{API_URL}/ingest/upload",
-                files=files
-            )
-            if response.status_code != 200:
-                st.error(response.text)
-                break
+        files = [
+            ("files", (file.name, file, "application/pdf"))
+            for file in uploaded_files
+        ]
+        response = requests.post(
+            f"{API_URL}/ingest/uploads",
+            files=files
+        )
+        if response.status_code != 200:
+            st.error(response.text)
         else:
-            st.success("Documents ingested successfully")
+            result = response.json()
+            for duplicate in result.get("duplicates", []):
+                st.info(
+                    f"Skipped {duplicate['file']}: "
+                    f"already ingested as {duplicate['duplicate_of']}"
+                )
+            st.success(
+                f"Ingested {len(result.get('uploaded_files', []))} new document(s)"
+            )
     else:
         st.warning("Please upload at least one PDF")
 
@@ -0,0 +1,95 @@
+"""Opt-in cProfile capture for individual requests."""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Only one profiler may be active at a time (on Python 3.12+ cProfile is
+# process-wide), so concurrent profiling requests are served unprofiled.
+# Being process-wide also means that on 3.12+ a profile includes whatever
+# other requests' threads ran meanwhile; on 3.11 and earlier it covers only
+# the thread that handled the profiled request.
+_PROFILER_LOCK = threading.Lock()
+
+
+class RequestProfiler:
+    """
+    Captures a cProfile profile of a block and stores it on disk.
+
+    Each profile is written as `<id>.prof` (loadable with pstats/snakeviz)
+    plus `<id>.txt` with the top functions by cumulative time. Only the
+    newest `max_profiles` profiles are kept.
+    """
+
+    def __init__(
+        self,
+        profile_dir: Path,
+        *,
+        max_profiles: int = 50,
+        summary_lines: int = 40,
+    ) -> None:
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        self.summary_lines = summary_lines
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[Optional[str]]:
+        """
+        Profile the enclosed block, yielding the profile id.
+
+        Yields None, and profiles nothing, if another request is already
+        being profiled.
+        """
+        if not _PROFILER_LOCK.acquire(blocking=False):
+            logger.warning("Profiler busy; serving %s request unprofiled", label)
+            yield None
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}"
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                yield profile_id
+            finally:
+                profiler.disable()
+                self._save(profile_id, profiler)
+        finally:
+            _PROFILER_LOCK.release()
+
+    def _save(self, profile_id: str, profiler: cProfile.Profile) -> None:
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats((self.profile_dir / f"{profile_id}.prof").as_posix())
+
+            summary = io.StringIO()
+            stats = pstats.Stats(profiler, stream=summary)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.summary_lines)
+            (self.profile_dir / f"{profile_id}.txt").write_text(
+                summary.getvalue(), encoding="utf-8"
+            )
+            logger.info("Saved request profile %s", profile_id)
+            self._prune()
+        except OSError as exc:
+            logger.error("Failed to save profile %s: %s", profile_id, exc)
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond `max_profiles`."""
+        profiles = sorted(
+            self.profile_dir.glob("*.prof"),
+            key=lambda path: (path.stat().st_mtime_ns, path.name),
+            reverse=True,
+        )
+        for stale in profiles[self.max_profiles:]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".txt").unlink(missing_ok=True)